@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class APIConfig(AppConfig):
     name = "api"
+
+    def ready(self):
+        """
+        Hooks the tracking of the changes and deletions of the objects
+        served by the API to the model signals.
+        """
+
+        from .signals import connect_signals
+
+        connect_signals()
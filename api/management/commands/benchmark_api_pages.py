@@ -0,0 +1,113 @@
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.urls import router
+from users.models import User
+from vzs.commands_utils import positive_int
+from vzs.settings import SERVER_DOMAIN
+
+
+class Command(BaseCommand):
+    help = (
+        "Pages through the lists of all the API viewsets and prints "
+        "the number of queries and the time spent per page. "
+        "Fails if the number of queries differs between the pages of a list."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=positive_int,
+            default=20,
+            help="Number of rows on a page.",
+        )
+        parser.add_argument(
+            "--fields",
+            help="Comma-separated names of the fields to serialize.",
+        )
+        parser.add_argument(
+            "--since",
+            help="List only the objects changed since the ISO 8601 date and time.",
+        )
+
+    def _measure(self, func):
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            result = func()
+            elapsed = perf_counter() - start
+
+        return result, len(context.captured_queries), elapsed
+
+    def _get_page(self, view, user, params):
+        request = APIRequestFactory().get("/", params, HTTP_HOST=SERVER_DOMAIN)
+        force_authenticate(request, user)
+
+        return view(request).render()
+
+    def _benchmark(self, prefix, viewset, user, params):
+        view = viewset.as_view({"get": "list"})
+        queries_per_page = []
+        total_time = 0
+        lists_deleted = "since" in params
+
+        while params is not None:
+            response, queries, elapsed = self._measure(
+                lambda: self._get_page(view, user, params)
+            )
+
+            if response.status_code != 200:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{prefix}: status {response.status_code} {response.data}"
+                    )
+                )
+                return False
+
+            queries_per_page.append(queries)
+            total_time += elapsed
+
+            next_url = response.data["next"]
+            params = (
+                {**params, "cursor": parse_qs(urlparse(next_url).query)["cursor"][0]}
+                if next_url is not None
+                else None
+            )
+
+        self.stdout.write(
+            f"{prefix} ({len(queries_per_page)} pages): "
+            f"{min(queries_per_page)}-{max(queries_per_page)} queries per page, "
+            f"{total_time / len(queries_per_page):.3f} s per page"
+        )
+
+        if lists_deleted:
+            # the first page lists also the deleted objects, exclude it
+            queries_per_page = queries_per_page[1:] or queries_per_page
+
+        return min(queries_per_page) == max(queries_per_page)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_superuser=True).first()
+
+        if user is None:
+            raise CommandError("Could not find a superuser to make the requests.")
+
+        params = {"page_size": options["page_size"]}
+        for option in ["fields", "since"]:
+            if options[option] is not None:
+                params[option] = options[option]
+
+        failed = False
+
+        for prefix, viewset, _ in router.registry:
+            if not self._benchmark(prefix, viewset, user, dict(params)):
+                failed = True
+
+        if failed:
+            raise CommandError("Benchmark found differences.")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
@@ -1,6 +1,14 @@
 from datetime import datetime
 
-from django.db.models import CharField
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import (
+    CASCADE,
+    CharField,
+    DateTimeField,
+    ForeignKey,
+    Model,
+    PositiveBigIntegerField,
+)
 from django.utils.translation import gettext_lazy as _
 from rest_framework.authtoken.models import Token as BaseToken
 
@@ -37,3 +45,52 @@ class Token(BaseToken):
     """:meta private:"""
     get_previous_by_created: ...
     """:meta private:"""
+
+
+class Tombstone(Model):
+    """
+    Records a deleted object served by the API,
+    so that the clients fetching only the changes learn about the deletion.
+
+    Soft deleted persons get a tombstone as well, as they are no longer served.
+    """
+
+    class Meta:
+        unique_together = ["content_type", "object_id"]
+
+    content_type = ForeignKey(ContentType, on_delete=CASCADE)
+    """
+    The model of the deleted object.
+    """
+
+    object_id = PositiveBigIntegerField()
+    """
+    The primary key of the deleted object.
+    """
+
+    deleted_at = DateTimeField(auto_now=True, db_index=True)
+    """
+    The date and time when the object was deleted.
+    """
+
+    @classmethod
+    def record(cls, model, pk):
+        """
+        Records the deletion of the object of ``model`` with primary key ``pk``.
+        """
+
+        cls.objects.update_or_create(
+            content_type=ContentType.objects.get_for_model(model), object_id=pk
+        )
+
+    @classmethod
+    def deleted_since(cls, model, since):
+        """
+        Returns the primary keys of the objects of ``model`` deleted
+        at or after ``since``.
+        """
+
+        return cls.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            deleted_at__gte=since,
+        ).values_list("object_id", flat=True)
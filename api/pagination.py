@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginates by the primary key using an opaque cursor.
+
+    Each page is selected by the primary key of the last row
+    of the previous page, so its cost doesn't grow with the offset
+    and the rows inserted meanwhile don't shift the pages.
+    """
+
+    ordering = "pk"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
@@ -0,0 +1,140 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.timezone import now
+
+from features.models import Feature
+from groups.models import Group
+from one_time_events.models import OneTimeEvent
+from persons.models import Person
+from positions.models import EventPosition
+from trainings.models import Training
+from transactions.models import Transaction
+from users.models import User
+
+from .models import Tombstone
+
+TRACKED_MODELS = [
+    Person,
+    Feature,
+    Group,
+    OneTimeEvent,
+    Training,
+    EventPosition,
+    Transaction,
+    User,
+]
+"""
+The models served by the API whose changes are tracked
+by their ``updated_at`` field and whose deletions are recorded as tombstones.
+"""
+
+_M2M_POST_ACTIONS = ["post_add", "post_remove", "post_clear"]
+
+_relation_fields = {}
+"""
+The many-to-many fields of the tracked models by their through models.
+"""
+
+
+def _touch(model, pks):
+    # ``update`` skips ``auto_now``
+    model._base_manager.filter(pk__in=pks).update(updated_at=now())
+
+
+def object_deleted(sender, instance, **kwargs):
+    """
+    Records a tombstone for a deleted object of a tracked model.
+    """
+
+    Tombstone.record(sender, instance.pk)
+
+
+def person_saved(sender, instance, raw=False, **kwargs):
+    """
+    Records a tombstone for a soft deleted person,
+    who is no longer served by the API.
+    """
+
+    if raw or not instance.is_deleted:
+        return
+
+    Tombstone.record(Person, instance.pk)
+
+
+def relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Updates ``updated_at`` of the objects whose many-to-many relation changed.
+    """
+
+    field = _relation_fields[sender]
+
+    if not reverse:
+        if action not in _M2M_POST_ACTIONS:
+            return
+
+        pks = [instance.pk]
+    elif action == "pre_clear":
+        pks = list(
+            field.model._base_manager.filter(**{field.name: instance}).values_list(
+                "pk", flat=True
+            )
+        )
+    elif action in ["post_add", "post_remove"]:
+        pks = list(pk_set)
+    else:
+        return
+
+    _touch(field.model, pks)
+
+
+def relation_row_changed(sender, instance, created=True, raw=False, **kwargs):
+    """
+    Updates ``updated_at`` of the object whose many-to-many relation
+    gained or lost a row of a custom through model.
+
+    Only the creation and the deletion of the row change the relation.
+    """
+
+    if raw or not created:
+        return
+
+    field = _relation_fields[sender]
+    owner_field = sender._meta.get_field(field.m2m_field_name())
+
+    _touch(field.model, [getattr(instance, owner_field.attname)])
+
+
+def connect_signals():
+    for model in TRACKED_MODELS:
+        post_delete.connect(
+            object_deleted,
+            sender=model,
+            dispatch_uid=f"tombstone_{model.__name__}_deleted",
+        )
+
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            _relation_fields[through] = field
+
+            m2m_changed.connect(
+                relation_changed,
+                sender=through,
+                dispatch_uid=f"updated_at_{through.__name__}_changed",
+            )
+
+            if through._meta.auto_created:
+                continue
+
+            post_save.connect(
+                relation_row_changed,
+                sender=through,
+                dispatch_uid=f"updated_at_{through.__name__}_saved",
+            )
+            post_delete.connect(
+                relation_row_changed,
+                sender=through,
+                dispatch_uid=f"updated_at_{through.__name__}_deleted",
+            )
+
+    post_save.connect(
+        person_saved, sender=Person, dispatch_uid="tombstone_person_saved"
+    )
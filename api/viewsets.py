@@ -1,4 +1,10 @@
-from rest_framework.permissions import IsAuthenticated
+from datetime import timedelta, timezone
+
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.relations import ManyRelatedField
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
@@ -19,8 +25,11 @@ from transactions.models import Transaction
 from transactions.serializers import TransactionSerializer
 from users.models import User
 from users.serializers import UserSerializer
+from vzs.settings import API_SYNC_MARGIN
 from vzs.utils import filter_queryset
 
+from .models import Tombstone
+from .pagination import KeysetPagination
 from .permissions import PersonPermission, TokenPermission, UserPermission
 from .utils import PersonExistsFilter
 
@@ -35,10 +44,156 @@ class APIPermissionMixin:
     """:meta private:"""
 
 
-class PersonViewSet(APIPermissionMixin, ModelViewSet):
+class APIQuerysetMixin:
+    """
+    Paginates the list by :class:`api.pagination.KeysetPagination`.
+
+    Serializes only the fields listed in the ``fields`` query parameter,
+    if given, and prefetches the many-to-many relations
+    of the serialized fields.
+
+    If ``since`` is given, the list contains only the objects changed
+    since then by their ``updated_at``. The first page of the response
+    then contains also ``next_since``, the value of ``since``
+    for the next synchronization, and ``deleted``, the primary keys
+    of the objects deleted since then by :class:`api.models.Tombstone`.
+    Both are left out of the following pages, as ``next_since`` must not
+    be later than the start of the walk through the pages.
+    ``next_since`` is moved back by ``API_SYNC_MARGIN`` seconds,
+    so the next synchronization may return some objects again.
+
+    **Query parameters:**
+
+    *   ``cursor`` - the page cursor from the ``next`` or ``previous`` link
+    *   ``page_size`` - the number of rows on a page
+    *   ``fields`` - comma-separated names of the fields to serialize
+    *   ``since`` - ISO 8601 date and time of the last synchronization
+    """
+
+    pagination_class = KeysetPagination
+    """:meta private:"""
+
+    def get_requested_fields(self):
+        """
+        Returns the set of the field names from the ``fields`` query parameter
+        or ``None`` if all the fields should be serialized.
+        """
+
+        fields = self.request.query_params.get("fields")
+
+        if self.request.method not in SAFE_METHODS or not fields:
+            return None
+
+        return {field.strip() for field in fields.split(",") if field.strip()}
+
+    def get_since(self):
+        """
+        Returns the aware date and time from the ``since`` query parameter
+        of a list request or ``None`` if all the objects should be listed.
+        """
+
+        since = self.request.query_params.get("since")
+
+        if self.action != "list" or not since:
+            return None
+
+        parsed = parse_datetime(since)
+
+        if parsed is None:
+            raise ValidationError({"since": f"Invalid date and time: {since}"})
+
+        return make_aware(parsed) if is_naive(parsed) else parsed
+
+    def get_serializer(self, *args, **kwargs):
+        """:meta private:"""
+
+        serializer = super().get_serializer(*args, **kwargs)
+        requested_fields = self.get_requested_fields()
+
+        if requested_fields is not None:
+            fields = getattr(serializer, "child", serializer).fields
+            unknown_fields = requested_fields - fields.keys()
+
+            if unknown_fields:
+                raise ValidationError(
+                    {"fields": f"Unknown fields: {', '.join(sorted(unknown_fields))}"}
+                )
+
+            for field_name in fields.keys() - requested_fields:
+                fields.pop(field_name)
+
+        return serializer
+
+    def get_queryset(self):
+        """
+        Prefetches the many-to-many relations of the serialized fields,
+        which would otherwise cost a query per row.
+        """
+
+        queryset = (
+            super()
+            .get_queryset()
+            .prefetch_related(
+                *(
+                    field.source
+                    for field in self.get_serializer().fields.values()
+                    if isinstance(field, ManyRelatedField)
+                )
+            )
+        )
+        since = self.get_since()
+
+        if since is not None:
+            queryset = queryset.filter(updated_at__gte=since)
+
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """:meta private:"""
+
+        # ``updated_at`` is the time of the save, not of the commit,
+        # so the rows of the transactions still running are caught next time
+        next_since = now() - timedelta(seconds=API_SYNC_MARGIN)
+        response = super().list(request, *args, **kwargs)
+        since = self.get_since()
+
+        is_first_page = (
+            request.query_params.get(self.paginator.cursor_query_param) is None
+        )
+
+        if since is not None and is_first_page:
+            response.data["next_since"] = next_since.astimezone(timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S.%fZ"
+            )
+            response.data["deleted"] = list(
+                Tombstone.deleted_since(self.queryset.model, since)
+            )
+
+        return response
+
+
+class PersonViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
+    """
+    **Query parameters:**
+
+    *   ``search`` - searches the persons by their names
+        with :meth:`persons.models.PersonQuerySet.search`.
+    """
+
     queryset = Person.objects.all()
     serializer_class = PersonSerializer
 
+    def get_queryset(self):
+        """:meta private:"""
+
+        queryset = super().get_queryset()
+        search = self.request.query_params.get("search")
+
+        if search:
+            return queryset.search(search)
+
+        return queryset
+
 
 class PersonExistsView(APIView):
     """
@@ -65,36 +220,36 @@ class PersonExistsView(APIView):
         return Response(does_exist)
 
 
-class FeatureViewSet(APIPermissionMixin, ModelViewSet):
+class FeatureViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
     queryset = Feature.qualifications.all()
     serializer_class = FeatureSerializer
 
 
-class GroupViewSet(APIPermissionMixin, ModelViewSet):
+class GroupViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
 
-class OneTimeEventViewSet(APIPermissionMixin, ModelViewSet):
+class OneTimeEventViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
     queryset = OneTimeEvent.objects.all()
     serializer_class = OneTimeEventSerializer
 
 
-class TrainingViewSet(APIPermissionMixin, ModelViewSet):
+class TrainingViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
     queryset = Training.objects.all()
     serializer_class = TrainingSerializer
 
 
-class PositionViewSet(APIPermissionMixin, ModelViewSet):
+class PositionViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
     queryset = EventPosition.objects.all()
     serializer_class = PositionSerializer
 
 
-class TransactionViewSet(APIPermissionMixin, ModelViewSet):
+class TransactionViewSet(APIPermissionMixin, APIQuerysetMixin, ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
 
 
-class UserViewSet(APIPermissionMixin, ReadOnlyModelViewSet):
+class UserViewSet(APIPermissionMixin, APIQuerysetMixin, ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -0,0 +1,5 @@
+from django.core.management import call_command
+
+
+def queued_emails_send():
+    call_command("send_queued_emails")
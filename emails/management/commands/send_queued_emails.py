@@ -0,0 +1,58 @@
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.core.management.base import BaseCommand
+
+from emails.models import QueuedEmail
+from emails.utils import send_queued_emails
+from vzs.commands_utils import positive_int
+from vzs.utils import now
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the emails waiting in the outbox "
+        "and deletes the sent emails older than <keep-days>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=positive_int,
+            default=100,
+            help="Number of emails processed in one DB transaction.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=positive_int,
+            default=5,
+            help="Number of attempts after which an email is marked as failed.",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=positive_int,
+            default=30,
+            help="Number of days the sent emails are kept in the outbox.",
+        )
+
+    def handle(self, *args, **options):
+        QueuedEmail.objects.filter(
+            state=QueuedEmail.State.SENT,
+            sent__lt=now() - timedelta(days=options["keep_days"]),
+        ).delete()
+
+        try:
+            result = send_queued_emails(options["batch_size"], options["max_attempts"])
+        except (OSError, SMTPException) as error:
+            self.stdout.write(
+                self.style.ERROR(f"Could not connect to the email server: {error}")
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sent {result.sent_count} emails, "
+                f"postponed {result.postponed_count} emails, "
+                f"{result.failed_count} emails failed."
+            )
+        )
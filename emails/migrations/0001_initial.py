@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:26
+
+import vzs.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=255, verbose_name="Předmět")),
+                ("html_message", models.TextField()),
+                ("from_email", models.CharField(max_length=255)),
+                (
+                    "recipient",
+                    models.EmailField(max_length=254, verbose_name="Příjemce"),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("fronta", "ve frontě"),
+                            ("odeslan", "odeslán"),
+                            ("selhal", "selhal"),
+                        ],
+                        default="fronta",
+                        max_length=7,
+                        verbose_name="Stav",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("next_attempt", models.DateTimeField(default=vzs.utils.now)),
+                ("last_error", models.TextField(blank=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("sent", models.DateTimeField(null=True)),
+            ],
+            options={
+                "ordering": ["-created"],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("emails", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queuedemail",
+            name="batch",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
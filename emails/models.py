@@ -0,0 +1,116 @@
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    EmailField,
+    Model,
+    PositiveSmallIntegerField,
+    TextChoices,
+    TextField,
+)
+from django.utils.translation import gettext_lazy as _
+
+from vzs.utils import now
+
+
+class QueuedEmail(Model):
+    """
+    Represents an email in the outbox waiting to be sent to a single recipient.
+
+    Emails are enqueued by :func:`vzs.utils.send_mail`
+    and sent by :func:`emails.utils.send_queued_emails`.
+    """
+
+    class Meta:
+        ordering = ["-created"]
+
+    class State(TextChoices):
+        QUEUED = "fronta", _("ve frontě")
+        SENT = "odeslan", _("odeslán")
+        FAILED = "selhal", _("selhal")
+
+    subject = CharField(_("Předmět"), max_length=255)
+    html_message = TextField()
+    from_email = CharField(max_length=255)
+    recipient = EmailField(_("Příjemce"))
+
+    state = CharField(
+        _("Stav"), max_length=7, choices=State.choices, default=State.QUEUED
+    )
+    """
+    The delivery status of the email.
+    """
+
+    attempts = PositiveSmallIntegerField(default=0)
+    """
+    The number of failed attempts to send the email.
+    """
+
+    next_attempt = DateTimeField(default=now)
+    """
+    The email is not sent before this time, used for postponing failed emails.
+    """
+
+    batch = CharField(max_length=64, blank=True, db_index=True)
+    """
+    Identifies emails enqueued together, used for tracking their delivery.
+    """
+
+    last_error = TextField(blank=True)
+    created = DateTimeField(auto_now_add=True)
+    sent = DateTimeField(null=True)
+
+    @classmethod
+    def enqueue(cls, subject, html_message, from_email, recipient_list, batch=""):
+        """
+        Adds an email for each of the recipients from ``recipient_list``
+        into the outbox.
+        """
+
+        return cls.enqueue_many(
+            [(subject, html_message, recipient_list)], from_email, batch
+        )
+
+    @classmethod
+    def enqueue_many(cls, emails, from_email, batch=""):
+        """
+        Adds a batch of emails into the outbox using a single query.
+
+        ``emails`` is an iterable of ``(subject, html_message, recipient_list)``
+        triples. Every email is added for each of its recipients.
+        """
+
+        queued_emails = []
+
+        for subject, html_message, recipient_list in emails:
+            recipients = dict.fromkeys(
+                recipient for recipient in recipient_list if recipient
+            )
+
+            queued_emails.extend(
+                cls(
+                    subject=subject,
+                    html_message=html_message,
+                    from_email=from_email,
+                    recipient=recipient,
+                    batch=batch,
+                )
+                for recipient in recipients
+            )
+
+        return cls.objects.bulk_create(queued_emails)
+
+    def as_message(self, connection=None):
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body="",
+            from_email=self.from_email,
+            to=[self.recipient],
+            connection=connection,
+        )
+        message.attach_alternative(self.html_message, "text/html")
+
+        return message
+
+    def __str__(self):
+        return f"{self.subject} ({self.recipient})"
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db.transaction import atomic
+
+from vzs.utils import now
+
+from .models import QueuedEmail
+
+RETRY_DELAY = timedelta(minutes=1)
+"""
+The delay before the first retry of a failed email, doubled with every attempt.
+"""
+
+
+@dataclass
+class SendQueuedEmailsResult:
+    """
+    Statistics of one run of :func:`send_queued_emails`.
+    """
+
+    sent_count: int = 0
+    postponed_count: int = 0
+    failed_count: int = 0
+
+
+def _record_failure(email: QueuedEmail, error: Exception, max_attempts: int):
+    email.attempts += 1
+    email.last_error = str(error)
+
+    if email.attempts >= max_attempts:
+        email.state = QueuedEmail.State.FAILED
+    else:
+        email.next_attempt = now() + RETRY_DELAY * 2 ** (email.attempts - 1)
+
+
+def send_queued_emails(batch_size: int = 100, max_attempts: int = 5):
+    """
+    Sends all due emails from the outbox over a single reused connection
+    to the email server.
+
+    The emails are processed in batches of ``batch_size`` ordered by the recipient.
+    A failed email is postponed with an exponential backoff
+    and marked as failed after ``max_attempts`` attempts.
+
+    Raises the connection error if the email server is unavailable,
+    the emails stay in the outbox in that case.
+
+    Returns :class:`SendQueuedEmailsResult`.
+    """
+
+    result = SendQueuedEmailsResult()
+
+    connection = get_connection()
+    connection.open()
+
+    try:
+        while True:
+            with atomic():
+                emails = list(
+                    QueuedEmail.objects.select_for_update(skip_locked=True)
+                    .filter(state=QueuedEmail.State.QUEUED, next_attempt__lte=now())
+                    .order_by("recipient", "pk")[:batch_size]
+                )
+
+                if not emails:
+                    break
+
+                for email in emails:
+                    try:
+                        connection.send_messages([email.as_message(connection)])
+                    except Exception as error:
+                        _record_failure(email, error, max_attempts)
+
+                        if email.state == QueuedEmail.State.FAILED:
+                            result.failed_count += 1
+                        else:
+                            result.postponed_count += 1
+                    else:
+                        email.state = QueuedEmail.State.SENT
+                        email.sent = now()
+                        result.sent_count += 1
+
+                QueuedEmail.objects.bulk_update(
+                    emails,
+                    ["state", "attempts", "next_attempt", "last_error", "sent"],
+                )
+    finally:
+        connection.close()
+
+    return result
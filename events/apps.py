@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class EventsConfig(AppConfig):
     name = "events"
+
+    def ready(self):
+        """
+        Hooks the maintenance of :class:`events.models.ParticipantEligibility`
+        to the model signals.
+        """
+
+        from .signals import connect_signals
+
+        connect_signals()
@@ -0,0 +1,5 @@
+from django.core.management import call_command
+
+
+def participant_eligibility_rebuild():
+    call_command("rebuild_eligibility")
@@ -0,0 +1,75 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from events.models import Event
+from events.utils import check_common_requirements, common_requirements_matrix
+from persons.models import Person
+from positions.models import EventPosition
+from vzs.commands_utils import positive_int
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the number of queries and the time spent checking common "
+        "requirements of events and positions pair by pair and in a batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--persons",
+            type=positive_int,
+            default=50,
+            help="Number of persons to evaluate the requirements for.",
+        )
+
+    def _measure(self, func):
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            result = func()
+            elapsed = perf_counter() - start
+
+        return result, len(context.captured_queries), elapsed
+
+    def _benchmark(self, label, instances, persons):
+        pairwise, pairwise_queries, pairwise_time = self._measure(
+            lambda: {
+                instance.pk: {
+                    person.pk
+                    for person in persons
+                    if check_common_requirements(instance, person)
+                }
+                for instance in instances
+            }
+        )
+
+        batch, batch_queries, batch_time = self._measure(
+            lambda: common_requirements_matrix(instances, persons)
+        )
+
+        if pairwise != batch:
+            self.stdout.write(self.style.ERROR(f"{label}: results differ."))
+            return False
+
+        self.stdout.write(
+            f"{label} ({len(instances)} x {len(persons)}): "
+            f"pairwise {pairwise_queries} queries in {pairwise_time:.3f} s, "
+            f"batch {batch_queries} queries in {batch_time:.3f} s"
+        )
+
+        return True
+
+    def handle(self, *args, **options):
+        persons = list(Person.objects.all()[: options["persons"]])
+
+        events_passed = self._benchmark("Events", list(Event.objects.all()), persons)
+        positions_passed = self._benchmark(
+            "Positions", list(EventPosition.objects.all()), persons
+        )
+
+        if not (events_passed and positions_passed):
+            raise CommandError("Benchmark found differences.")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
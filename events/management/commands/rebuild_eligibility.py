@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from events.models import ParticipantEligibility
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the table of persons satisfying the participant requirements "
+        "of unfinished events from scratch."
+    )
+
+    def handle(self, *args, **options):
+        ParticipantEligibility.refresh()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully rebuilt {ParticipantEligibility.objects.count()} "
+                f"eligibility records."
+            )
+        )
@@ -0,0 +1,144 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:03
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from vzs.utils import today
+
+
+def fill_participant_eligibility(apps, schema_editor):
+    """
+    Does the work of the ``rebuild_eligibility`` command
+    with the historical models, as the listings of available events
+    would be empty until its first run.
+    """
+
+    Event = apps.get_model("events", "Event")
+    Group = apps.get_model("groups", "Group")
+    OneTimeEvent = apps.get_model("one_time_events", "OneTimeEvent")
+    ParticipantEligibility = apps.get_model("events", "ParticipantEligibility")
+    Person = apps.get_model("persons", "Person")
+    TrainingParticipantEnrollment = apps.get_model(
+        "trainings", "TrainingParticipantEnrollment"
+    )
+
+    current_date = today()
+    events = list(
+        Event.objects.filter(date_end__gte=current_date).values_list(
+            "pk", "min_age", "max_age", "group_id"
+        )
+    )
+
+    allowed_person_types = defaultdict(set)
+    for event_pk, person_type in Event.allowed_person_types.through.objects.values_list(
+        "event_id", "eventpersontypeconstraint__person_type"
+    ):
+        allowed_person_types[event_pk].add(person_type)
+
+    memberships = set(
+        Group.members.through.objects.values_list("group_id", "person_id")
+    )
+    training_categories = dict(
+        OneTimeEvent.objects.filter(training_category__isnull=False).values_list(
+            "pk", "training_category"
+        )
+    )
+    attended_categories = set(
+        TrainingParticipantEnrollment.objects.filter(state="schvalen").values_list(
+            "person_id", "training__category"
+        )
+    )
+
+    eligibilities = []
+
+    for person_pk, date_of_birth, person_type in Person.objects.filter(
+        is_deleted=False
+    ).values_list("pk", "date_of_birth", "person_type"):
+        age = (
+            current_date.year
+            - date_of_birth.year
+            - (
+                (current_date.month, current_date.day)
+                < (date_of_birth.month, date_of_birth.day)
+            )
+            if date_of_birth is not None
+            else None
+        )
+
+        for event_pk, min_age, max_age, group_pk in events:
+            if min_age is not None or max_age is not None:
+                if age is None:
+                    continue
+
+                if min_age is not None and min_age > age:
+                    continue
+
+                if max_age is not None and max_age < age:
+                    continue
+
+            if group_pk is not None and (group_pk, person_pk) not in memberships:
+                continue
+
+            allowed = allowed_person_types[event_pk]
+
+            if allowed and person_type not in allowed:
+                continue
+
+            training_category = training_categories.get(event_pk)
+
+            if (
+                training_category is not None
+                and (person_pk, training_category) not in attended_categories
+            ):
+                continue
+
+            eligibilities.append(
+                ParticipantEligibility(event_id=event_pk, person_id=person_pk)
+            )
+
+    ParticipantEligibility.objects.bulk_create(eligibilities)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0002_initial"),
+        ("groups", "0003_alter_group_options"),
+        ("one_time_events", "0006_alter_onetimeevent_options"),
+        ("persons", "0008_alter_person_options_alter_personhourlyrate_options"),
+        ("trainings", "0004_alter_training_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParticipantEligibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="events.event"
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="persons.person"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("person", "event")},
+            },
+        ),
+        migrations.RunPython(fill_participant_eligibility, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from itertools import groupby
 
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db.models import (
@@ -16,6 +17,7 @@ from django.db.models import (
     TextChoices,
     TextField,
 )
+from django.db.transaction import atomic
 from django.utils.translation import gettext_lazy as _
 from polymorphic.managers import PolymorphicManager
 from polymorphic.models import PolymorphicModel
@@ -25,7 +27,7 @@ from vzs.models import RenderableModelMixin
 from vzs.settings import PARTICIPANT_ENROLL_DEADLINE_DAYS
 from vzs.utils import today
 
-from .utils import check_common_requirements
+from .utils import common_requirements_matrix
 
 
 class EventOrOccurrenceState(TextChoices):
@@ -107,6 +109,9 @@ class Event(RenderableModelMixin, PolymorphicModel):
         related_name="event_person_type_constraint_set",
     )
 
+    # time of the last change, served incrementally by the API
+    updated_at = DateTimeField(auto_now=True, null=True, db_index=True)
+
     def is_one_time_event(self):
         from one_time_events.models import OneTimeEvent
 
@@ -125,8 +130,23 @@ class Event(RenderableModelMixin, PolymorphicModel):
     def position_assignments_sorted(self):
         return self.eventpositionassignment_set.order_by("position__name")
 
+    @classmethod
+    def participants_requirements_matrix(cls, events, persons):
+        """
+        Batch version of :meth:`does_participant_satisfy_requirements`.
+
+        Returns a mapping of the primary key of each event
+        to the set of primary keys of persons that satisfy its requirements
+        using a constant number of queries.
+        """
+
+        return common_requirements_matrix(events, persons)
+
     def does_participant_satisfy_requirements(self, person):
-        return check_common_requirements(self, person)
+        return (
+            person.pk
+            in self.participants_requirements_matrix([self], [person])[self.pk]
+        )
 
     def has_free_spot(self):
         return self.capacity is None
@@ -178,7 +198,21 @@ class Event(RenderableModelMixin, PolymorphicModel):
         raise NotImplementedError
 
     def participants_by_Q(self, condition):
-        return [enrollment.person for enrollment in self.enrollments_by_Q(condition)]
+        """
+        Returns a queryset of the persons with an enrollment
+        matching ``condition``.
+
+        The enrollments of the concrete event type are selected
+        by a subquery, so the result can be composed with other filters
+        of persons without loading the enrollments.
+
+        Deleted persons are included, as their enrollments still count
+        towards the capacity of the event.
+        """
+
+        return Person._base_manager.filter(
+            pk__in=self.enrollments_by_Q(condition).values("person")
+        )
 
     def approved_enrollments(self):
         return self.enrollments_by_Q(Q(state=ParticipantEnrollment.State.APPROVED))
@@ -189,6 +223,12 @@ class Event(RenderableModelMixin, PolymorphicModel):
     def rejected_enrollments(self):
         return self.enrollments_by_Q(Q(state=ParticipantEnrollment.State.REJECTED))
 
+    def all_possible_enrollments(self):
+        return self.enrollments_by_Q(
+            Q(state=ParticipantEnrollment.State.APPROVED)
+            | Q(state=ParticipantEnrollment.State.SUBSTITUTE)
+        )
+
     def all_possible_participants(self):
         return self.participants_by_Q(
             Q(state=ParticipantEnrollment.State.APPROVED)
@@ -207,6 +247,49 @@ class Event(RenderableModelMixin, PolymorphicModel):
     def substitute_enrollments_2_capacity(self):
         raise NotImplementedError
 
+    @staticmethod
+    def positions_requirements_matrix(events, persons):
+        """
+        Batch version of :meth:`does_person_satisfy_position_requirements`.
+
+        Returns a mapping of the primary key of each event to a mapping
+        of the primary keys of its positions to the sets of primary keys
+        of persons that satisfy the requirements of the position
+        on the first day of the event.
+
+        Issues a constant number of queries.
+        """
+
+        from positions.models import EventPosition
+
+        events = {event.pk: event for event in events}
+
+        position_assignments = EventPositionAssignment.objects.filter(
+            event__in=list(events)
+        ).select_related("position")
+
+        positions_on_dates = [
+            (assignment.event_id, assignment.position)
+            for assignment in position_assignments
+        ]
+
+        positions_matrix = EventPosition.requirements_matrix(
+            (
+                (position, events[event_pk].date_start)
+                for event_pk, position in positions_on_dates
+            ),
+            persons,
+        )
+
+        matrix = {event_pk: {} for event_pk in events}
+
+        for event_pk, position in positions_on_dates:
+            matrix[event_pk][position.pk] = positions_matrix[
+                position.pk, events[event_pk].date_start
+            ]
+
+        return matrix
+
     def can_person_interact_with(self, person):
         return (
             self.is_organizer(person)
@@ -214,12 +297,10 @@ class Event(RenderableModelMixin, PolymorphicModel):
             or (
                 today() <= self.date_end
                 and any(
-                    [
-                        position.does_person_satisfy_requirements(
-                            person, self.date_start
-                        )
-                        for position in self.positions.all()
-                    ]
+                    person.pk in persons
+                    for persons in self.positions_requirements_matrix([self], [person])[
+                        self.pk
+                    ].values()
                 )
             )
         )
@@ -245,6 +326,35 @@ class Event(RenderableModelMixin, PolymorphicModel):
                     return True
         return False
 
+    def can_enroll_organizer(self, person, positions_matrix=None):
+        """
+        Checks whether ``person`` can enroll as an organizer
+        to any position of any occurrence.
+
+        ``positions_matrix`` is the entry of :meth:`positions_requirements_matrix`
+        for this event. It is computed if not provided.
+        """
+
+        if person is None:
+            return False
+
+        if positions_matrix is None:
+            positions_matrix = self.positions_requirements_matrix([self], [person])[
+                self.pk
+            ]
+
+        qualified_position_assignments = [
+            position_assignment
+            for position_assignment in self.eventpositionassignment_set.all()
+            if person.pk in positions_matrix.get(position_assignment.position_id, ())
+        ]
+
+        return any(
+            occurrence.is_position_open_for(person, position_assignment)
+            for occurrence in self.eventoccurrence_set.all()
+            for position_assignment in qualified_position_assignments
+        )
+
     def is_organizer(self, person):
         return NotImplementedError
 
@@ -278,12 +388,20 @@ class EventOccurrence(PolymorphicModel):
         assignments = self.position_organizers(position_assignment)
         return assignments.filter(person=person).first()
 
+    def is_position_open_for(self, person, position_assignment):
+        """
+        Checks the conditions of :meth:`can_enroll_position`
+        except for the requirements of the position.
+        """
+
+        return (
+            self.can_position_be_still_enrolled()
+            and self.has_position_free_spot(position_assignment)
+            and not self.get_person_organizer_assignment(person).exists()
+        )
+
     def can_enroll_position(self, person, position_assignment):
-        if (
-            not self.can_position_be_still_enrolled()
-            or not self.has_position_free_spot(position_assignment)
-            or self.get_person_organizer_assignment(person).exists()
-        ):
+        if not self.is_position_open_for(person, position_assignment):
             return False
 
         return self.event.does_person_satisfy_position_requirements(
@@ -381,3 +499,60 @@ class EventPersonTypeConstraint(Model):
 
     def __str__(self):
         return self.get_person_type_display()
+
+
+class ParticipantEligibility(Model):
+    """
+    Materialized result of :meth:`Event.does_participant_satisfy_requirements`
+    for unfinished events.
+
+    A row exists if and only if the person satisfies the participant requirements
+    of the event. Kept up to date by the handlers in :mod:`events.signals`
+    and rebuilt daily by the ``rebuild_eligibility`` command
+    because the age of persons changes over time.
+    """
+
+    person = ForeignKey("persons.Person", on_delete=CASCADE)
+    event = ForeignKey("events.Event", on_delete=CASCADE)
+
+    class Meta:
+        unique_together = ["person", "event"]
+
+    @staticmethod
+    def refresh(events=None, persons=None):
+        """
+        Recomputes the eligibility of ``persons`` for ``events``.
+
+        If ``events`` is ``None``, all unfinished events are refreshed.
+        If ``persons`` is ``None``, all persons are refreshed.
+        Both ``events`` and ``persons`` may be querysets or iterables of instances.
+        """
+
+        stale = ParticipantEligibility.objects.all()
+
+        if events is None:
+            events = Event.objects.filter(date_end__gte=today())
+        else:
+            stale = stale.filter(event__in=[event.pk for event in events])
+
+        events = sorted(events, key=lambda event: type(event).__name__)
+
+        if persons is None:
+            persons = Person.objects.all()
+        else:
+            stale = stale.filter(person__in=persons)
+
+        eligibilities = []
+
+        for model, model_events in groupby(events, key=type):
+            matrix = model.participants_requirements_matrix(model_events, persons)
+
+            eligibilities.extend(
+                ParticipantEligibility(event_id=event_pk, person_id=person_pk)
+                for event_pk, person_pks in matrix.items()
+                for person_pk in person_pks
+            )
+
+        with atomic():
+            stale.delete()
+            ParticipantEligibility.objects.bulk_create(eligibilities)
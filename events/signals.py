@@ -0,0 +1,88 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from groups.models import Group
+from one_time_events.models import OneTimeEvent
+from persons.models import Person
+from trainings.models import Training
+from vzs.utils import today
+
+from .models import Event, ParticipantEligibility
+
+_M2M_POST_ACTIONS = ["post_add", "post_remove", "post_clear"]
+
+
+def person_saved(sender, instance, raw=False, **kwargs):
+    """
+    Refreshes the eligibility of a person whose age, type or deletion changed.
+    """
+
+    if raw:
+        return
+
+    ParticipantEligibility.refresh(persons=[instance])
+
+
+def event_saved(sender, instance, raw=False, **kwargs):
+    """
+    Refreshes the eligibility for an event whose requirements changed.
+    """
+
+    if raw:
+        return
+
+    ParticipantEligibility.refresh(events=[instance])
+
+
+def event_allowed_person_types_changed(sender, instance, action, reverse, **kwargs):
+    """
+    Refreshes the eligibility for an event whose allowed person types changed.
+    """
+
+    if action not in _M2M_POST_ACTIONS:
+        return
+
+    ParticipantEligibility.refresh(events=None if reverse else [instance])
+
+
+def group_members_changed(sender, instance, action, reverse, **kwargs):
+    """
+    Refreshes the eligibility after a change of group membership.
+    """
+
+    if action not in _M2M_POST_ACTIONS:
+        return
+
+    if reverse:
+        ParticipantEligibility.refresh(persons=[instance])
+    else:
+        ParticipantEligibility.refresh(
+            events=Event.objects.filter(group=instance, date_end__gte=today())
+        )
+
+
+def group_deleted(sender, instance, **kwargs):
+    """
+    Refreshes the eligibility for all events as they might have lost
+    their group requirement.
+    """
+
+    ParticipantEligibility.refresh()
+
+
+def connect_signals():
+    post_save.connect(person_saved, sender=Person, dispatch_uid="person_saved")
+    for model in [OneTimeEvent, Training]:
+        post_save.connect(
+            event_saved, sender=model, dispatch_uid=f"event_{model.__name__}_saved"
+        )
+    post_delete.connect(group_deleted, sender=Group, dispatch_uid="group_deleted")
+    m2m_changed.connect(
+        event_allowed_person_types_changed,
+        sender=Event.allowed_person_types.through,
+        dispatch_uid="event_allowed_person_types_changed",
+    )
+    m2m_changed.connect(
+        group_members_changed,
+        sender=Group.members.through,
+        dispatch_uid="group_members_changed",
+    )
@@ -1,5 +1,8 @@
+from collections import defaultdict
 from datetime import date, datetime
 
+from django.db.models import QuerySet
+
 from persons.models import Person
 
 
@@ -11,52 +14,132 @@ def parse_czech_date(date_str) -> date:
     return datetime.strptime(date_str, "%d. %m. %Y").date()
 
 
-def check_common_requirements(event_or_position, person: Person) -> bool:
+def _person_pks(persons):
     """
-    Checks for common requirements of events or event positions.
+    Returns the primary keys of ``persons`` in a form usable in ``__in`` lookups.
 
-    Namely:
-    *   minimum age
-    *   maximum age
-    *   group
-    *   allowed person types
+    Querysets are kept lazy so that they are evaluated as a subquery.
     """
 
-    from events.models import EventPersonTypeConstraint
+    if isinstance(persons, QuerySet):
+        return persons.values("pk")
 
-    person_with_age = Person.objects.with_age().get(id=person.id)
+    return [person.pk for person in persons]
 
-    missing_age = person_with_age.age is None and (
-        event_or_position.min_age is not None or event_or_position.max_age is not None
-    )
 
-    min_age_out = event_or_position.min_age is not None and (
-        missing_age or event_or_position.min_age > person_with_age.age
-    )
+def _allowed_person_types(events_or_positions):
+    """
+    Returns a mapping of primary keys of ``events_or_positions``
+    to the sets of their allowed person types in a single query.
+    """
 
-    max_age_out = event_or_position.max_age is not None and (
-        missing_age or event_or_position.max_age < person_with_age.age
-    )
+    field = type(events_or_positions[0])._meta.get_field("allowed_person_types")
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
 
-    group_unsatisfied = (
-        event_or_position.group is not None
-        and event_or_position.group not in person.groups.all()
-    )
+    allowed_person_types = defaultdict(set)
+
+    for pk, person_type in field.remote_field.through.objects.filter(
+        **{f"{source}__in": [instance.pk for instance in events_or_positions]}
+    ).values_list(f"{source}_id", f"{target}__person_type"):
+        allowed_person_types[pk].add(person_type)
+
+    return allowed_person_types
+
+
+def common_requirements_matrix(events_or_positions, persons) -> dict[int, set[int]]:
+    """
+    Checks for common requirements of many events or event positions
+    for many persons at once.
+
+    ``events_or_positions`` must be either all events or all event positions.
+    ``persons`` may be a queryset or an iterable of persons.
+
+    Returns a mapping of the primary key of each event or position
+    to the set of primary keys of persons that satisfy its requirements.
+
+    Issues at most three queries regardless of the number of events and persons.
+
+    See :func:`check_common_requirements` for the list of requirements.
+    """
+
+    from groups.models import Group
+
+    events_or_positions = list(events_or_positions)
+
+    matrix = {instance.pk: set() for instance in events_or_positions}
 
-    allowed_person_types_unsatisfied = (
-        event_or_position.allowed_person_types.exists()
-        and not event_or_position.allowed_person_types.contains(
-            EventPersonTypeConstraint.get_or_create(person.person_type)
+    if not events_or_positions:
+        return matrix
+
+    person_pks = _person_pks(persons)
+
+    persons_with_age = Person.objects.with_age().filter(pk__in=person_pks)
+
+    group_pks = {
+        instance.group_id
+        for instance in events_or_positions
+        if instance.group_id is not None
+    }
+
+    memberships = (
+        set(
+            Group.members.through.objects.filter(
+                group_id__in=group_pks, person_id__in=person_pks
+            ).values_list("group_id", "person_id")
         )
+        if group_pks
+        else set()
     )
 
-    if (
-        missing_age
-        or min_age_out
-        or max_age_out
-        or group_unsatisfied
-        or allowed_person_types_unsatisfied
+    allowed_person_types = _allowed_person_types(events_or_positions)
+
+    for person_pk, age, person_type in persons_with_age.values_list(
+        "pk", "age", "person_type"
     ):
-        return False
+        for instance in events_or_positions:
+            if instance.min_age is not None or instance.max_age is not None:
+                if age is None:
+                    continue
+
+                if instance.min_age is not None and instance.min_age > age:
+                    continue
+
+                if instance.max_age is not None and instance.max_age < age:
+                    continue
+
+            if (
+                instance.group_id is not None
+                and (instance.group_id, person_pk) not in memberships
+            ):
+                continue
+
+            allowed = allowed_person_types[instance.pk]
+
+            if allowed and person_type not in allowed:
+                continue
+
+            matrix[instance.pk].add(person_pk)
+
+    return matrix
+
 
-    return True
+def check_common_requirements(event_or_position, person: Person) -> bool:
+    """
+    Checks for common requirements of events or event positions.
+
+    Namely:
+    *   minimum age
+    *   maximum age
+    *   group
+    *   allowed person types
+
+    A thin wrapper around :func:`common_requirements_matrix`.
+    """
+
+    return (
+        person.pk
+        in common_requirements_matrix([event_or_position], [person])[
+            event_or_position.pk
+        ]
+    )
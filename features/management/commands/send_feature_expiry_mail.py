@@ -1,55 +1,69 @@
+from collections import defaultdict
 from datetime import timedelta
 
-from django.core.management import BaseCommand
 from django.db.models import F
 from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
 
 from features.models import Feature, FeatureAssignment
-from vzs import settings
+from vzs.commands_utils import DigestCommand
 from vzs.settings import CURRENT_DATETIME, FEATURE_EXPIRE_HOURS_SEND_MAIL
-from vzs.utils import send_notification_email
 
 
-class Command(BaseCommand):
-    help = "Sends mails to all persons whose features are about to expire and have not received the mail already."
+class Command(DigestCommand):
+    help = (
+        "Sends mails to all persons whose features are about to expire and have not "
+        "received the mail already. Each person receives a single digest."
+    )
+    subject = _("Zdvořilé upozornění")
 
-    def handle(self, *args, **options):
-        observed_feature_assignments = FeatureAssignment.objects.annotate(
-            date_diff=F("date_expire") - localdate(CURRENT_DATETIME())
-        ).filter(
-            date_diff__lte=timedelta(hours=FEATURE_EXPIRE_HOURS_SEND_MAIL),
-            expiry_email_sent=False,
-            date_returned=None,
+    def collect_digests(self):
+        observed_feature_assignments = (
+            FeatureAssignment.objects.annotate(
+                date_diff=F("date_expire") - localdate(CURRENT_DATETIME())
+            )
+            .filter(
+                date_diff__lte=timedelta(hours=FEATURE_EXPIRE_HOURS_SEND_MAIL),
+                expiry_email_sent=False,
+                date_returned=None,
+            )
+            .select_related("feature", "person")
         )
 
+        self.feature_assignment_ids = []
+        digests = defaultdict(list)
+
         for feature_assignment in observed_feature_assignments:
-            email_text = self._create_email_text(
-                feature_assignment.feature.feature_type, feature_assignment
+            digests[feature_assignment.person].append(
+                self._create_email_text(
+                    feature_assignment.feature.feature_type, feature_assignment
+                )
             )
+            self.feature_assignment_ids.append(feature_assignment.pk)
 
-            send_notification_email(
-                _("Zdvořilé upozornění"), email_text, [feature_assignment.person]
-            )
+        return digests
 
-            feature_assignment.expiry_email_sent = True
-            feature_assignment.save()
+    def mark_processed(self):
+        FeatureAssignment.objects.filter(pk__in=self.feature_assignment_ids).update(
+            expiry_email_sent=True
+        )
 
+    @staticmethod
     def _create_email_text(feature_type: str, feature_assignment: FeatureAssignment):
         match feature_type:
             case Feature.Type.EQUIPMENT:
                 return _(
-                    f"Vámi zapůjčenému vybavení {feature_assignment.feature}"
+                    f"Vámi zapůjčenému vybavení {feature_assignment.feature} "
                     f"končí výpůjční lhůta dne {feature_assignment.date_expire}"
                 )
             case Feature.Type.QUALIFICATION:
                 return _(
-                    f"Dne {feature_assignment.date_expire} dojde k expiraci"
+                    f"Dne {feature_assignment.date_expire} dojde k expiraci "
                     f"vaší současné kvalifikace {feature_assignment.feature}"
                 )
             case Feature.Type.PERMISSION:
                 return _(
-                    f"Dne {feature_assignment.date_expire} dojde k expiraci"
+                    f"Dne {feature_assignment.date_expire} dojde k expiraci "
                     f"vašeho současného oprávnění {feature_assignment.feature}"
                 )
             case _:
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("features", "0007_alter_featureassignment_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feature",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
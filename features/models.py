@@ -3,6 +3,7 @@ from django.db.models import (
     BooleanField,
     CharField,
     DateField,
+    DateTimeField,
     ForeignKey,
     Manager,
     Model,
@@ -59,6 +60,7 @@ class Feature(MPTTModel):
         _("Evidovat vydavatele kvalifikace"), blank=True, null=True
     )
     collect_codes = BooleanField(blank=True, null=True)
+    updated_at = DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return self.name
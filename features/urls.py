@@ -2,6 +2,7 @@ from django.urls import path
 
 from .views import (
     FeatureAssignToSelectedPersonView,
+    FeatureAssignmentExportView,
     FeatureDeleteView,
     FeatureDetailView,
     FeatureEditView,
@@ -21,4 +22,9 @@ urlpatterns = [
         FeatureAssignToSelectedPersonView.as_view(),
         name="assign",
     ),
+    path(
+        "<int:pk>/exportovat/",
+        FeatureAssignmentExportView.as_view(),
+        name="export",
+    ),
 ]
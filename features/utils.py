@@ -1,3 +1,12 @@
+from collections import defaultdict
+
+from django.db.models import Q
+
+from vzs.utils import today
+
+from .models import FeatureAssignment
+
+
 def extend_form_of_labels(form, form_labels):
     """
     Sets the labels of the form fields to the given values.
@@ -12,3 +21,46 @@ def extend_form_of_labels(form, form_labels):
                 form.fields[field].label = label
 
     return form
+
+
+def get_features_assignment_matrix(feature):
+    """
+    Returns the assignable features of the subtree of ``feature``
+    and the persons with any of them currently assigned.
+
+    The assignments of the whole subtree are loaded with a single query
+    together with the persons and pivoted in memory. Returns a dictionary with:
+
+    *   ``columns`` - list of the features
+    *   ``rows`` - list of pairs of a person and a list of booleans,
+        whether the person has the feature of each column assigned
+    """
+
+    columns = list(feature.get_descendants(include_self=True).filter(assignable=True))
+
+    assignments = (
+        FeatureAssignment.objects.filter(
+            feature__tree_id=feature.tree_id,
+            feature__lft__gte=feature.lft,
+            feature__rght__lte=feature.rght,
+            feature__assignable=True,
+            date_returned__isnull=True,
+        )
+        .filter(Q(date_expire__isnull=True) | Q(date_expire__gte=today()))
+        .select_related("person")
+        .order_by("person__last_name", "person__first_name", "person")
+    )
+
+    persons = {}
+    assigned_features = defaultdict(set)
+    for assignment in assignments:
+        persons.setdefault(assignment.person_id, assignment.person)
+        assigned_features[assignment.person_id].add(assignment.feature_id)
+
+    return {
+        "columns": columns,
+        "rows": [
+            (person, [column.pk in assigned_features[pk] for column in columns])
+            for pk, person in persons.items()
+        ],
+    }
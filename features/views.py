@@ -1,22 +1,24 @@
+from itertools import chain
+
 from django.contrib.messages import error as error_message
 from django.contrib.messages import success as success_message
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import BadRequest
+from django.core.paginator import Paginator
 from django.db import IntegrityError
-from django.db.models import Exists, OuterRef, Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.base import View
-from django.views.generic.detail import DetailView
+from django.views.generic.detail import DetailView, SingleObjectMixin
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
 
 from persons.models import Person
 from persons.views import PersonPermissionMixin
 from vzs.mixins import MessagesMixin
-from vzs.utils import today
+from vzs.utils import get_csv_streaming_http_response, today
 
 from .forms import (
     FeatureAssignmentByFeatureForm,
@@ -25,7 +27,7 @@ from .forms import (
 )
 from .models import Feature, FeatureAssignment, FeatureTypeTexts
 from .permissions import FeaturePermissionMixin
-from .utils import extend_form_of_labels
+from .utils import extend_form_of_labels, get_features_assignment_matrix
 
 
 class FeatureMixin(FeaturePermissionMixin):
@@ -315,13 +317,29 @@ class FeatureDetailView(FeatureMixin, DetailView):
     model = Feature
     template_name = "features/detail.html"
 
+    paginate_by = 50
+    """:meta private:"""
+
     def get_context_data(self, **kwargs):
         """
         *   ``assignment_matrix`` - matrix of persons
             and their assignments of the feature
+        *   ``page_obj`` - the current page of the persons,
+            each as a pair of a person and a list of pairs
+            of a feature and whether it is assigned
         """
 
-        kwargs.setdefault("assignment_matrix", self._get_features_assignment_matrix())
+        matrix = get_features_assignment_matrix(self.object)
+        page = Paginator(matrix["rows"], self.paginate_by).get_page(
+            self.request.GET.get("page")
+        )
+        page.object_list = [
+            (person, list(zip(matrix["columns"], assigned)))
+            for person, assigned in page.object_list
+        ]
+
+        kwargs.setdefault("assignment_matrix", matrix)
+        kwargs.setdefault("page_obj", page)
 
         return super().get_context_data(**kwargs)
 
@@ -331,46 +349,52 @@ class FeatureDetailView(FeatureMixin, DetailView):
         feature_type_params = self.feature_type_texts
         return super().get_queryset().filter(feature_type=feature_type_params.shortcut)
 
-    def _get_features_assignment_matrix(self):
+
+class FeatureAssignmentExportView(FeatureMixin, SingleObjectMixin, View):
+    """
+    Exports the matrix of persons and their assignments of a feature
+    and its descendants as a CSV file.
+
+    **Permissions**:
+
+    Users with the appropriate feature category permission.
+
+    **View parameters**:
+
+    *   ``feature_type`` - feature category
+
+    **Path parameters**:
+
+    *   ``pk`` - feature ID
+    """
+
+    model = Feature
+    http_method_names = ["get"]
+    """:meta private:"""
+
+    def get(self, request, *args, **kwargs):
         """:meta private:"""
 
-        all_features = (
-            self.object.get_descendants(include_self=True)
-            .filter(assignable=True)
-            .prefetch_related("featureassignment_set")
-        )
+        feature = self.get_object()
+        matrix = get_features_assignment_matrix(feature)
 
-        all_persons = Person.objects.filter(
-            featureassignment__feature__in=all_features
-        ).distinct()
-
-        features_assignment_matrix = {
-            "columns": all_features,
-            "rows": [],
-        }
-
-        for person in all_persons:
-            features = all_features.annotate(
-                is_assigned=Exists(
-                    FeatureAssignment.objects.filter(
-                        person=person,
-                        feature=OuterRef("pk"),
-                        date_returned__isnull=True,
-                    ).filter(Q(date_expire__isnull=True) | Q(date_expire__gte=today()))
-                )
-            )
+        rows = chain(
+            [[_("Osoba")] + [column.name for column in matrix["columns"]]],
+            (
+                [str(person)] + [_("ano") if a else "" for a in assigned]
+                for person, assigned in matrix["rows"]
+            ),
+        )
 
-            assigned_features = [f.is_assigned for f in features]
+        return get_csv_streaming_http_response(
+            f"vzs_{self.feature_type_texts.shortcut}_{feature.pk}_prirazeni", rows
+        )
 
-            if any(assigned_features):
-                features_assignment_matrix["rows"].append(
-                    {
-                        "person": person,
-                        "features": features,
-                    }
-                )
+    def get_queryset(self):
+        """:meta private:"""
 
-        return features_assignment_matrix
+        feature_type_params = self.feature_type_texts
+        return super().get_queryset().filter(feature_type=feature_type_params.shortcut)
 
 
 class FeatureEditView(FeatureMixin, MessagesMixin, UpdateView):
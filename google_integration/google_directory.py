@@ -11,23 +11,126 @@ TUTORIAL HOW TO MAKE ENABLE GOOGLE ADMIN SDK
 
 from collections.abc import Iterable, MutableSequence
 from dataclasses import dataclass
+from functools import cache
+from threading import Lock, local
+from time import monotonic, sleep
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
-from vzs.settings import GOOGLE_DOMAIN, GOOGLE_SERVICE_ACCOUNT_PATH
+from vzs.settings import (
+    GOOGLE_DIRECTORY_RATE_LIMIT,
+    GOOGLE_DOMAIN,
+    GOOGLE_SERVICE_ACCOUNT_PATH,
+)
 
 USER_SCOPE = "https://www.googleapis.com/auth/admin.directory.user"
 GROUP_SCOPE = "https://www.googleapis.com/auth/admin.directory.group"
 GROUP_MEMBERS_SCOPE = "https://www.googleapis.com/auth/admin.directory.group.member"
 
+MAX_BATCH_SIZE = 1000
+"""
+The maximum number of calls the Admin SDK accepts in a single batch request.
+"""
 
-def _get_service(scopes):
-    credentials = service_account.Credentials.from_service_account_file(
+
+class RateLimiter:
+    """
+    Limits the number of API calls per second shared by all threads.
+
+    Every call of a batch request counts against the Directory API quota,
+    so a batch reserves as many slots as it contains calls.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._lock = Lock()
+        self._next_slot = monotonic()
+
+    def acquire(self, count=1):
+        """
+        Blocks until ``count`` calls can be made without exceeding the rate.
+        """
+
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + count / self.rate
+
+        sleep(max(slot - now, 0))
+
+
+_rate_limiter = RateLimiter(GOOGLE_DIRECTORY_RATE_LIMIT)
+
+_thread_local = local()
+
+
+@cache
+def _get_credentials(scopes):
+    return service_account.Credentials.from_service_account_file(
         GOOGLE_SERVICE_ACCOUNT_PATH, scopes=scopes
     )
 
-    return build("admin", "directory_v1", credentials=credentials)
+
+def _get_service(scopes):
+    """
+    Returns the Directory API service authorized for ``scopes``.
+
+    The service is cached for each thread because its HTTP client
+    is not thread-safe. The credentials are shared, so their access token
+    is reused by all the threads.
+    """
+
+    scopes = tuple(scopes)
+    services = _thread_local.__dict__.setdefault("services", {})
+
+    if scopes not in services:
+        services[scopes] = build(
+            "admin",
+            "directory_v1",
+            credentials=_get_credentials(scopes),
+            cache_discovery=False,
+        )
+
+    return services[scopes]
+
+
+def _execute(request):
+    _rate_limiter.acquire()
+
+    return request.execute()
+
+
+def _execute_in_batches(service, requests):
+    """
+    Executes ``requests`` using batch requests of at most ``MAX_BATCH_SIZE`` calls.
+
+    ``requests`` is a list of ``(key, request)`` pairs.
+    Returns the keys of the requests that failed.
+    """
+
+    failed_keys = []
+
+    for start in range(0, len(requests), MAX_BATCH_SIZE):
+        chunk = requests[start : start + MAX_BATCH_SIZE]
+
+        def callback(request_id, response, exception, chunk=chunk):
+            if exception is not None:
+                failed_keys.append(chunk[int(request_id)][0])
+
+        batch = service.new_batch_http_request(callback=callback)
+
+        for request_id, (key, request) in enumerate(chunk):
+            batch.add(request, request_id=str(request_id))
+
+        _rate_limiter.acquire(len(chunk))
+
+        try:
+            batch.execute()
+        except Exception:
+            failed_keys.extend(key for key, request in chunk)
+
+    return failed_keys
 
 
 def get_list_of_users():
@@ -36,8 +139,8 @@ def get_list_of_users():
     page_token = None
 
     while True:
-        results = (
-            service.users().list(domain=GOOGLE_DOMAIN, pageToken=page_token).execute()
+        results = _execute(
+            service.users().list(domain=GOOGLE_DOMAIN, pageToken=page_token)
         )
 
         for user in results.get("users", []):
@@ -70,8 +173,8 @@ def get_list_of_groups() -> Iterable[GroupInfo]:
     page_token = None
 
     while True:
-        results = (
-            service.groups().list(domain=GOOGLE_DOMAIN, pageToken=page_token).execute()
+        results = _execute(
+            service.groups().list(domain=GOOGLE_DOMAIN, pageToken=page_token)
         )
 
         for group in results.get("groups", []):
@@ -101,8 +204,8 @@ def get_group_members(group_email) -> Iterable[MemberInfo]:
     page_token = None
 
     while True:
-        results = (
-            service.members().list(groupKey=group_email, pageToken=page_token).execute()
+        results = _execute(
+            service.members().list(groupKey=group_email, pageToken=page_token)
         )
 
         for member in results.get("members", []):
@@ -123,21 +226,63 @@ def get_group_members(group_email) -> Iterable[MemberInfo]:
     return members_list
 
 
-def add_member_to_group(member_email, group_email):
+def add_members_to_group(member_emails, group_email):
+    """
+    Adds the members to the group using batch requests.
+
+    Returns the emails of the members that could not be added,
+    e.g. because they already are members of the group.
+    """
+
+    if not member_emails:
+        return []
+
     service = _get_service([GROUP_MEMBERS_SCOPE])
+    members = service.members()
+
+    return _execute_in_batches(
+        service,
+        [
+            (
+                member_email,
+                members.insert(
+                    groupKey=group_email,
+                    body={"email": member_email, "role": "MEMBER"},
+                ),
+            )
+            for member_email in member_emails
+        ],
+    )
 
-    member_body = {"email": member_email, "role": "MEMBER"}
 
-    try:
-        service.members().insert(groupKey=group_email, body=member_body).execute()
-    except Exception:
-        pass
+def remove_members_from_group(member_emails, group_email):
+    """
+    Removes the members from the group using batch requests.
 
+    Returns the emails of the members that could not be removed.
+    """
+
+    if not member_emails:
+        return []
 
-def remove_member_from_group(member_email, group_email):
     service = _get_service([GROUP_MEMBERS_SCOPE])
+    members = service.members()
+
+    return _execute_in_batches(
+        service,
+        [
+            (
+                member_email,
+                members.delete(groupKey=group_email, memberKey=member_email),
+            )
+            for member_email in member_emails
+        ],
+    )
 
-    try:
-        service.members().delete(groupKey=group_email, memberKey=member_email).execute()
-    except Exception:
-        pass
+
+def add_member_to_group(member_email, group_email):
+    add_members_to_group([member_email], group_email)
+
+
+def remove_member_from_group(member_email, group_email):
+    remove_members_from_group([member_email], group_email)
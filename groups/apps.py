@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class GroupsConfig(AppConfig):
     name = "groups"
+
+    def ready(self):
+        """
+        Hooks the journal of membership changes
+        :class:`groups.models.GroupMembershipChange` to the model signals.
+        """
+
+        from .signals import connect_signals
+
+        connect_signals()
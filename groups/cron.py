@@ -0,0 +1,9 @@
+from django.core.management import call_command
+
+
+def groups_sync():
+    call_command("sync_groups")
+
+
+def groups_full_sync():
+    call_command("sync_groups", full=True)
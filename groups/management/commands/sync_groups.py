@@ -1,16 +1,43 @@
 from django.core.management.base import BaseCommand
 
 from groups.models import Group
-from groups.utils import sync_single_group_with_google
+from groups.utils import sync_groups_with_google, sync_single_group_with_google
 
 
 class Command(BaseCommand):
-    help = "Synchronize local groups with Google Workplace's groups."
+    help = (
+        "Synchronize local groups with Google Workplace's groups. "
+        "Only the journaled membership changes are pushed to the Google groups "
+        "unless --full is given."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("group_id", nargs="?", type=int)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Compare the whole member lists of all the groups.",
+        )
+
+    def _report(self, result):
+        if result.error is not None:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Group {result.group.name} failed after "
+                    f"{result.elapsed:.3f} s: {result.error}"
+                )
+            )
+            return
+
+        self.stdout.write(
+            f"Group {result.group.name} ({'full' if result.full else 'incremental'}) "
+            f"in {result.elapsed:.3f} s: "
+            f"Google +{result.google_added_count} -{result.google_removed_count} "
+            f"({result.google_failed_count} failed), "
+            f"local +{result.local_added_count} -{result.local_removed_count}"
+        )
 
-    def _handle_single(self, group_id):
+    def _handle_single(self, group_id, full):
         group = Group.objects.filter(pk=group_id).first()
 
         if group is None:
@@ -27,20 +54,35 @@ class Command(BaseCommand):
             )
             return
 
-        sync_single_group_with_google(group)
+        result = sync_single_group_with_google(group, full)
+        self._report(result)
 
-        self.stdout.write(
-            self.style.SUCCESS("Successfully synchronized group {}.").format(group.name)
+        if result.error is None:
+            self.stdout.write(
+                self.style.SUCCESS(f"Successfully synchronized group {group.name}.")
+            )
+
+    def _handle_all(self, full):
+        results = sync_groups_with_google(
+            Group.objects.filter(google_email__isnull=False), full
         )
 
-    def _handle_all(self):
-        for group in Group.objects.filter(google_email__isnull=False):
-            sync_single_group_with_google(group)
+        for result in results:
+            self._report(result)
+
+        failed_count = sum(result.error is not None for result in results)
 
-        self.stdout.write(self.style.SUCCESS("Successfully synchronized all groups."))
+        if failed_count:
+            self.stdout.write(
+                self.style.ERROR(f"Failed to synchronize {failed_count} groups.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS("Successfully synchronized all groups.")
+            )
 
-    def handle(self, group_id, **options):
+    def handle(self, group_id, full, **options):
         if group_id is not None:
-            self._handle_single(group_id)
+            self._handle_single(group_id, full)
         else:
-            self._handle_all()
+            self._handle_all(full)
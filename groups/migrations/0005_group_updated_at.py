@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0004_group_google_synced_groupmembershipchange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
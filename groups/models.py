@@ -1,4 +1,14 @@
-from django.db.models import BooleanField, CharField, EmailField, ManyToManyField, Model
+from django.db.models import (
+    CASCADE,
+    BooleanField,
+    CharField,
+    DateTimeField,
+    EmailField,
+    ForeignKey,
+    ManyToManyField,
+    Model,
+    TextChoices,
+)
 from django.utils.translation import gettext_lazy as _
 
 from persons.models import Person
@@ -19,7 +29,48 @@ class Group(Model):
     google_as_members_authority = BooleanField(_("Je Google autorita seznamu členů?"))
     members = ManyToManyField(Person, related_name="groups")
 
+    google_synced = DateTimeField(null=True, editable=False)
+    """
+    Time of the last synchronization with the Google group.
+
+    ``None`` if the group has to be fully synchronized,
+    e.g. because its Google group has changed.
+    """
+
+    updated_at = DateTimeField(auto_now=True, null=True, db_index=True)
+    """
+    Time of the last change of the group or of its members.
+
+    The synchronizations with Google update only ``google_synced``
+    and leave it as it is.
+    """
+
     def __str__(self):
         email_out = f" <{self.google_email}>" if self.google_email is not None else ""
 
         return f"{self.name}{email_out}"
+
+
+class GroupMembershipChange(Model):
+    """
+    Represents a change of a group membership
+    which has not been synchronized with the Google group yet.
+
+    Only the changes of groups with a Google group are recorded.
+    """
+
+    class Meta:
+        ordering = ["pk"]
+
+    class Action(TextChoices):
+        ADDED = "pridan", _("přidán")
+        REMOVED = "odebran", _("odebrán")
+
+    group = ForeignKey(Group, on_delete=CASCADE, related_name="membership_changes")
+    email = EmailField(max_length=255)
+    """
+    The email of the person at the time of the change.
+    """
+
+    action = CharField(max_length=7, choices=Action.choices)
+    created = DateTimeField(auto_now_add=True)
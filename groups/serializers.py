@@ -11,7 +11,7 @@ from .models import Group
 class GroupSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = Group
-        fields = "__all__"
+        exclude = ["google_synced"]
         extra_kwargs = {"url": {"view_name": "api:group-detail"}}
 
     members = HyperlinkedRelatedField(
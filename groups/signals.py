@@ -0,0 +1,84 @@
+from django.db.models.signals import m2m_changed, pre_save
+
+from persons.models import Person
+
+from .models import Group, GroupMembershipChange
+
+
+def _record_changes(groups, persons, action):
+    GroupMembershipChange.objects.bulk_create(
+        GroupMembershipChange(group=group, email=person.email, action=action)
+        for group in groups
+        for person in persons
+    )
+
+
+def group_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Records the membership changes of groups with a Google group
+    into the :class:`groups.models.GroupMembershipChange` journal.
+    """
+
+    if action == "pre_clear":
+        change_action = GroupMembershipChange.Action.REMOVED
+    elif action == "post_add":
+        change_action = GroupMembershipChange.Action.ADDED
+    elif action == "post_remove":
+        change_action = GroupMembershipChange.Action.REMOVED
+    else:
+        return
+
+    if reverse:
+        if instance.email is None:
+            return
+
+        groups = instance.groups.all() if pk_set is None else Group.objects.all()
+        groups = groups.filter(google_email__isnull=False)
+
+        if pk_set is not None:
+            groups = groups.filter(pk__in=pk_set)
+
+        _record_changes(groups, [instance], change_action)
+    else:
+        if instance.google_email is None:
+            return
+
+        persons = instance.members.all() if pk_set is None else Person.objects.all()
+        persons = persons.filter(email__isnull=False)
+
+        if pk_set is not None:
+            persons = persons.filter(pk__in=pk_set)
+
+        _record_changes([instance], persons, change_action)
+
+
+def group_saved(sender, instance, raw=False, **kwargs):
+    """
+    Schedules a full synchronization of a group whose Google group
+    or members authority changed, as the journal does not describe
+    the differences against the new Google group.
+    """
+
+    if raw or instance.pk is None:
+        return
+
+    previous = (
+        Group.objects.filter(pk=instance.pk)
+        .values("google_email", "google_as_members_authority")
+        .first()
+    )
+
+    if previous != {
+        "google_email": instance.google_email,
+        "google_as_members_authority": instance.google_as_members_authority,
+    }:
+        instance.google_synced = None
+
+
+def connect_signals():
+    pre_save.connect(group_saved, sender=Group, dispatch_uid="group_saved")
+    m2m_changed.connect(
+        group_members_changed,
+        sender=Group.members.through,
+        dispatch_uid="group_members_journal",
+    )
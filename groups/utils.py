@@ -1,39 +1,241 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from django.db.models import Max, Q, prefetch_related_objects
+
 from google_integration import google_directory
 from persons.models import Person
+from vzs.settings import GOOGLE_SYNC_WORKERS
+from vzs.utils import now
 
+from .models import Group, GroupMembershipChange
 
-def sync_single_group_with_google(local_group):
+
+@dataclass
+class GroupSyncResult:
     """
-    Synchronizes members of a local IS group with a Google group.
+    Summary of a synchronization of a single group with its Google group.
+    """
+
+    group: Group
+    full: bool
+    """
+    Whether the member lists were compared,
+    otherwise only the journaled changes were pushed to the Google group.
+    """
+
+    google_added_count: int = 0
+    google_removed_count: int = 0
+    google_failed_count: int = 0
+    google_failed_emails: set[str] = field(default_factory=set)
+    """
+    Emails whose addition to or removal from the Google group failed,
+    their journaled changes are kept to be pushed again next time.
+    """
+
+    local_added_count: int = 0
+    local_removed_count: int = 0
+    elapsed: float = 0
+    error: Exception | None = None
+
+
+def _local_member_emails(local_group):
+    return {p.email for p in local_group.members.all() if p.email is not None}
+
+
+def _pending_changes(local_groups):
+    """
+    Returns the journaled membership changes of the groups
+    as a mapping of group IDs to the last action for each email.
+    """
+
+    changes = {group.pk: {} for group in local_groups}
+
+    for group_id, email, action in GroupMembershipChange.objects.filter(
+        group__in=local_groups
+    ).values_list("group_id", "email", "action"):
+        changes[group_id][email] = action
+
+    return changes
+
+
+def _sync_google_group(result, local_emails, changes):
+    """
+    Synchronizes the Google group, unless it is the authority, with the local group.
+
+    In the full mode the member lists are compared,
+    otherwise only the journaled ``changes`` are pushed.
+
+    Only calls the Google API, so it can run outside of the main thread.
+    Returns the emails of the Google group members in the full mode.
+    """
+
+    start = perf_counter()
+    group = result.group
+    google_emails = None
+
+    if result.full:
+        google_emails = {
+            m.email for m in google_directory.get_group_members(group.google_email)
+        }
+        members_to_add = local_emails - google_emails
+        members_to_remove = google_emails - local_emails
+    else:
+        members_to_add = {
+            email
+            for email, action in changes.items()
+            if action == GroupMembershipChange.Action.ADDED
+        }
+        members_to_remove = changes.keys() - members_to_add
+
+    if not group.google_as_members_authority:
+        failed_emails = google_directory.add_members_to_group(
+            members_to_add, group.google_email
+        ) + google_directory.remove_members_from_group(
+            members_to_remove, group.google_email
+        )
+
+        result.google_added_count = len(members_to_add)
+        result.google_removed_count = len(members_to_remove)
+        result.google_failed_count = len(failed_emails)
+        result.google_failed_emails = set(failed_emails)
+
+    result.elapsed += perf_counter() - start
+
+    return google_emails
+
+
+def _update_local_groups(results, local_emails, google_emails, persons_by_email):
+    for result in results:
+        start = perf_counter()
+        group = result.group
+
+        emails_to_add = google_emails[group.pk] - local_emails[group.pk]
+        emails_to_remove = local_emails[group.pk] - google_emails[group.pk]
+
+        persons_to_add = [
+            persons_by_email[email]
+            for email in emails_to_add
+            if email in persons_by_email
+        ]
+        members_to_remove = [
+            member for member in group.members.all() if member.email in emails_to_remove
+        ]
+
+        group.members.add(*persons_to_add)
+        group.members.remove(*members_to_remove)
+
+        result.local_added_count = len(persons_to_add)
+        result.local_removed_count = len(members_to_remove)
+        result.elapsed += perf_counter() - start
+
+
+def sync_groups_with_google(local_groups, full=False):
+    """
+    Synchronizes members of local IS groups with their Google groups.
 
     If the Google group is the authority,
     then the local group is updated to match the Google group.
     Otherwise, the Google group is updated to match the local group.
+
+    The Google groups which are not the authority receive only the changes
+    recorded in the :class:`groups.models.GroupMembershipChange` journal,
+    unless ``full`` is set or the group has never been synchronized.
+    The other groups always compare the whole member lists.
+    The journaled changes of the members whose update of the Google group
+    failed are kept and pushed again next time.
+
+    The Google groups are processed concurrently by ``GOOGLE_SYNC_WORKERS``
+    threads, which share the rate limit of the Directory API.
+    The local groups are read and updated in the calling thread only.
+
+    Returns a :class:`GroupSyncResult` for each group.
     """
 
-    google_email = local_group.google_email
+    local_groups = list(local_groups)
+    results = [
+        GroupSyncResult(
+            group,
+            full or group.google_synced is None or group.google_as_members_authority,
+        )
+        for group in local_groups
+    ]
 
-    local_emails = {p.email for p in local_group.members.all() if p.email is not None}
-    google_emails = {m.email for m in google_directory.get_group_members(google_email)}
+    last_change_id = GroupMembershipChange.objects.aggregate(Max("pk"))["pk__max"]
+    changes = _pending_changes(local_groups)
 
-    if not local_group.google_as_members_authority:
-        members_to_add = local_emails - google_emails
-        members_to_remove = google_emails - local_emails
+    full_groups = [result.group for result in results if result.full]
+    prefetch_related_objects(full_groups, "members")
+    local_emails = {group.pk: _local_member_emails(group) for group in full_groups}
 
-        for email in members_to_add:
-            google_directory.add_member_to_group(email, google_email)
+    with ThreadPoolExecutor(max_workers=GOOGLE_SYNC_WORKERS) as executor:
+        futures = [
+            executor.submit(
+                _sync_google_group,
+                result,
+                local_emails.get(result.group.pk),
+                changes[result.group.pk],
+            )
+            for result in results
+        ]
 
-        for email in members_to_remove:
-            google_directory.remove_member_from_group(email, google_email)
-    else:
-        members_to_add = google_emails - local_emails
-        members_to_remove = local_emails - google_emails
+    google_emails = {}
+
+    for result, future in zip(results, futures):
+        result.error = future.exception()
+
+        if result.error is None:
+            google_emails[result.group.pk] = future.result()
+
+    synced_results = [result for result in results if result.error is None]
+    authority_results = [
+        result for result in synced_results if result.group.google_as_members_authority
+    ]
+
+    persons_by_email = Person.objects.in_bulk(
+        set().union(
+            *(
+                google_emails[result.group.pk] - local_emails[result.group.pk]
+                for result in authority_results
+            )
+        ),
+        field_name="email",
+    )
+    _update_local_groups(
+        authority_results, local_emails, google_emails, persons_by_email
+    )
+
+    # The changes made after the journal was read and the ones that failed
+    # are pushed next time, the ones of authoritative Google groups
+    # are already reflected.
+    pushed_changes = GroupMembershipChange.objects.filter(
+        Q(group__in=[result.group for result in authority_results])
+        | Q(
+            group__in=[result.group for result in synced_results],
+            pk__lte=last_change_id or 0,
+        )
+    )
 
-        for email in members_to_add:
-            local_person = Person.objects.filter(email=email).first()
+    for result in synced_results:
+        if result.google_failed_emails:
+            pushed_changes = pushed_changes.exclude(
+                group=result.group, email__in=result.google_failed_emails
+            )
 
-            if local_person is not None:
-                local_group.members.add(local_person)
+    pushed_changes.delete()
+    Group.objects.filter(pk__in=[result.group.pk for result in synced_results]).update(
+        google_synced=now()
+    )
+
+    return results
+
+
+def sync_single_group_with_google(local_group, full=False):
+    """
+    Synchronizes members of a local IS group with a Google group.
+
+    See :func:`sync_groups_with_google` for more info.
+    """
 
-        for email in members_to_remove:
-            local_group.members.remove(Person.objects.get(email=email))
+    return sync_groups_with_google([local_group], full)[0]
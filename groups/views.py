@@ -10,8 +10,6 @@ from django.views.generic.detail import DetailView, SingleObjectMixin
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
 
-from google_integration import google_directory
-from groups.utils import sync_single_group_with_google
 from vzs.mixins import MessagesMixin
 from .forms import (
     AddMembersGroupForm,
@@ -95,7 +93,8 @@ class GroupAddMembersView(GroupPermissionMixin, MessagesMixin, UpdateView):
     """
     Adds persons to a group.
 
-    Also adds the persons to the Google group if the group has one specified.
+    The change is pushed to the Google group, if the group has one specified,
+    by the ``sync_groups`` command.
 
     **Success redirection view**: :class:`groups.views.GroupDetailView`
 
@@ -133,13 +132,6 @@ class GroupAddMembersView(GroupPermissionMixin, MessagesMixin, UpdateView):
         form.instance.members.set(combined_members)
         del form.cleaned_data["members"]
 
-        if form.instance.google_email:
-            for new_member in new_members:
-                if new_member.email is not None:
-                    google_directory.add_member_to_group(
-                        new_member.email, form.instance.google_email
-                    )
-
         return super().form_valid(form)
 
 
@@ -200,7 +192,8 @@ class GroupRemoveMemberView(GroupPermissionMixin, SingleObjectMixin, View):
     """
     Removes a person from the group.
 
-    Also removes the person from the Google group if the group has one specified.
+    The change is pushed to the Google group, if the group has one specified,
+    by the ``sync_groups`` command.
 
     **Success redirection view**: :class:`groups.views.GroupDetailView`
 
@@ -234,11 +227,6 @@ class GroupRemoveMemberView(GroupPermissionMixin, SingleObjectMixin, View):
 
         group.members.remove(member_to_remove_id)
 
-        if group.google_email:
-            google_directory.remove_member_from_group(
-                Person.objects.get(pk=member_to_remove_id).email, group.google_email
-            )
-
         success_message(request, self.success_message)
 
         return redirect(self.get_success_url())
@@ -246,9 +234,11 @@ class GroupRemoveMemberView(GroupPermissionMixin, SingleObjectMixin, View):
 
 class SyncGroupMembersWithGoogleView(GroupPermissionMixin, SingleObjectMixin, View):
     """
-    Synchronizes the group with its Google group, if it has one specified.
+    Schedules a full synchronization of the group with its Google group,
+    if it has one specified.
 
-    See :func:`groups.utils.sync_single_group_with_google` for more info.
+    The synchronization itself is run in the background by the ``sync_groups``
+    command, see :func:`groups.utils.sync_groups_with_google` for more info.
 
     **Permissions**:
 
@@ -263,7 +253,8 @@ class SyncGroupMembersWithGoogleView(GroupPermissionMixin, SingleObjectMixin, Vi
     model = Group
     pk_url_kwarg = "group_id"
     success_message = _(
-        "Synchronizace skupiny {group_name} s Google Workplace byla úspěšná."
+        "Synchronizace skupiny {group_name} s Google Workplace byla naplánována "
+        "a proběhne během několika minut."
     )
 
     def get(self, request, *args, **kwargs):
@@ -282,7 +273,7 @@ class SyncGroupMembersWithGoogleView(GroupPermissionMixin, SingleObjectMixin, Vi
 
             return redirect(reverse("groups:detail", args=[group.pk]))
 
-        sync_single_group_with_google(group)
+        Group.objects.filter(pk=group.pk).update(google_synced=None)
 
         success_message(
             request,
@@ -294,10 +285,9 @@ class SyncGroupMembersWithGoogleView(GroupPermissionMixin, SingleObjectMixin, Vi
 
 class SyncGroupMembersWithGoogleAllView(GroupPermissionMixin, View):
     """
-    Synchronizes all groups with their Google groups.
+    Schedules a full synchronization of all groups with their Google groups.
 
-    See :class:`SyncGroupMembersWithGoogleView`
-    and  :func:`groups.utils.sync_single_group_with_google` for more info.
+    See :class:`SyncGroupMembersWithGoogleView` for more info.
 
     **Permissions**:
 
@@ -309,12 +299,14 @@ class SyncGroupMembersWithGoogleAllView(GroupPermissionMixin, View):
     def get(self, request, *args, **kwargs):
         """:meta private:"""
 
-        for group in Group.objects.filter(google_email__isnull=False):
-            sync_single_group_with_google(group)
+        Group.objects.filter(google_email__isnull=False).update(google_synced=None)
 
         success_message(
             request,
-            _("Synchronizace všech skupin s Google Workplace byla úspěšná."),
+            _(
+                "Synchronizace všech skupin s Google Workplace byla naplánována "
+                "a proběhne během několika minut."
+            ),
         )
 
         return redirect(reverse("groups:index"))
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class OneTimeEventsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "one_time_events"
+
+    def ready(self):
+        """
+        Hooks the maintenance of :class:`events.models.ParticipantEligibility`
+        to the changes of training enrollments.
+        """
+
+        from .signals import connect_signals
+
+        connect_signals()
@@ -729,11 +729,18 @@ class OneTimeEventEnrollMyselfOrganizerForm(
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        positions = self.event.eventpositionassignment_set.all()
+        positions_matrix = self.event.positions_requirements_matrix(
+            [self.event], [self.person]
+        )[self.event.pk]
+        positions = [
+            position
+            for position in self.event.eventpositionassignment_set.all()
+            if self.person.pk in positions_matrix[position.position_id]
+        ]
         can_enroll_positions_ids = []
         for position in positions:
             for occurrence in self.event.eventoccurrence_set.all():
-                if occurrence.can_enroll_position(self.person, position):
+                if occurrence.is_position_open_for(self.person, position):
                     can_enroll_positions_ids.append(position.id)
                     break
         self.fields[
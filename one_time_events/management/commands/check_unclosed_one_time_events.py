@@ -1,53 +1,59 @@
 import datetime
 from collections import defaultdict
 
-from django.core.management.base import BaseCommand
 from django.urls import reverse
 
-from events.models import EventOrOccurrenceState, Event
-from one_time_events.models import OneTimeEventOccurrence
-from users.utils import get_permission_by_codename
+from events.models import EventOrOccurrenceState
+from one_time_events.models import OneTimeEvent, OneTimeEventOccurrence
+from users.utils import get_permission_holders
+from vzs.commands_utils import DigestCommand
 from vzs.settings import ONE_TIME_EVENT_CLOSE_DEADLINE_DAYS, CURRENT_DATETIME
-from vzs.utils import get_server_url, send_notification_email
+from vzs.utils import get_server_url
 
 
-class Command(BaseCommand):
-    help = "Send notification about unclosed one-time events."
+class Command(DigestCommand):
+    help = (
+        "Send notification about unclosed one-time events. "
+        "Each organizer and category administrator receives a single digest."
+    )
+    subject = "Upozornění na neuzavřené události"
 
-    def handle(self, *args, **options):
+    def collect_digests(self):
         deadline = CURRENT_DATETIME() - datetime.timedelta(
             days=ONE_TIME_EVENT_CLOSE_DEADLINE_DAYS
         )
         unclosed_event_occurrences = OneTimeEventOccurrence.objects.filter(
             state=EventOrOccurrenceState.OPEN, event__date_end__lt=deadline
-        )
+        ).prefetch_related("organizers")
 
         event_organizers = defaultdict(set)
 
         for unclosed_event_occurrence in unclosed_event_occurrences:
-            notifications_receivers = set(unclosed_event_occurrence.organizers.all())
-            event_organizers[unclosed_event_occurrence.event.id].update(
-                notifications_receivers
+            event_organizers[unclosed_event_occurrence.event_id].update(
+                unclosed_event_occurrence.organizers.all()
             )
 
+        events = OneTimeEvent.objects.in_bulk(event_organizers.keys())
+        category_admins = get_permission_holders(
+            {event.category for event in events.values()}
+        )
+
+        digests = defaultdict(list)
+
         for event_id, organizers in event_organizers.items():
-            event = Event.objects.get(pk=event_id)
+            event = events[event_id]
 
             url_address = get_server_url() + reverse(
                 "one_time_events:detail", kwargs={"pk": event_id}
             )
 
-            send_notification_email(
-                "Upozornění na neuzavřenou událost",
-                f"Uzavřete událost s názvem {event.name} na adrese {url_address}",
-                organizers,
-            )
-            category_admins = [
-                user.person
-                for user in get_permission_by_codename(event.category).user_set.all()
-            ]
-            send_notification_email(
-                "Upozornění na neuzavřenou událost",
-                f"Upozorňujeme Vás jako správce událostí druhu {event.get_category_display()}, že událost s názvem {event.name} na adrese {url_address} není uzavřena",
-                category_admins,
-            )
+            for organizer in organizers:
+                digests[organizer].append(
+                    f"Uzavřete událost s názvem {event.name} na adrese {url_address}"
+                )
+            for category_admin in category_admins.get(event.category, []):
+                digests[category_admin].append(
+                    f"Upozorňujeme Vás jako správce událostí druhu {event.get_category_display()}, že událost s názvem {event.name} na adrese {url_address} není uzavřena"
+                )
+
+        return digests
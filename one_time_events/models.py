@@ -2,8 +2,10 @@ from datetime import timedelta
 
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery
 from django.utils.translation import gettext_lazy as _
+from polymorphic.managers import PolymorphicManager
+from polymorphic.query import PolymorphicQuerySet
 
 from events.models import (
     Event,
@@ -13,7 +15,7 @@ from events.models import (
     ParticipantEnrollment,
 )
 from persons.models import PersonHourlyRate
-from trainings.models import Training
+from trainings.models import Training, TrainingParticipantEnrollment
 from transactions.models import Transaction
 from vzs import settings
 from vzs.utils import today
@@ -24,6 +26,24 @@ class OneTimeEventAttendance(models.TextChoices):
     MISSING = "absence", _("absence")
 
 
+class OneTimeEventQuerySet(PolymorphicQuerySet):
+    def with_person_status(self, person):
+        """
+        Annotates the events with the enrollment of ``person``:
+
+        *   ``participant_enrollment_id`` - ID of the participant enrollment
+            or ``None``
+        """
+
+        enrollments = OneTimeEventParticipantEnrollment.objects.filter(
+            one_time_event=OuterRef("pk"), person=person
+        )
+
+        return self.annotate(
+            participant_enrollment_id=Subquery(enrollments.values("pk")[:1]),
+        )
+
+
 class OneTimeEvent(Event):
     class Category(models.TextChoices):
         COMMERCIAL = "komercni", _("komerční")
@@ -32,6 +52,8 @@ class OneTimeEvent(Event):
         FOR_CHILDREN = "pro-deti", _("pro děti")
         SOCIAL = "spolecenska", _("společenská")
 
+    objects = PolymorphicManager.from_queryset(OneTimeEventQuerySet)()
+
     enrolled_participants = models.ManyToManyField(
         "persons.Person",
         through="one_time_events.OneTimeEventParticipantEnrollment",
@@ -59,29 +81,47 @@ class OneTimeEvent(Event):
     def is_open(self):
         return self.state == EventOrOccurrenceState.OPEN
 
-    def does_participant_satisfy_requirements(self, person):
-        if not super().does_participant_satisfy_requirements(person):
-            return False
+    @classmethod
+    def participants_requirements_matrix(cls, events, persons):
+        events = list(events)
+        matrix = super().participants_requirements_matrix(events, persons)
+
+        training_categories = {
+            event.training_category
+            for event in events
+            if event.training_category is not None
+        }
+
+        if not training_categories:
+            return matrix
+
+        attended_categories = set(
+            TrainingParticipantEnrollment.objects.filter(
+                training__category__in=training_categories,
+                person__in=set().union(*matrix.values()),
+                state=ParticipantEnrollment.State.APPROVED,
+            ).values_list("person_id", "training__category")
+        )
 
-        if (
-            self.training_category is not None
-            and not Training.does_person_attends_training_of_category(
-                person, self.training_category
-            )
-        ):
-            return False
+        for event in events:
+            if event.training_category is not None:
+                matrix[event.pk] = {
+                    person_pk
+                    for person_pk in matrix[event.pk]
+                    if (person_pk, event.training_category) in attended_categories
+                }
 
-        return True
+        return matrix
 
     def has_free_spot(self):
         possibly_free = super().has_free_spot()
         if not possibly_free:
             if self.participants_enroll_state == ParticipantEnrollment.State.APPROVED:
-                return len(self.approved_participants()) < self.capacity
+                return self.approved_enrollments().count() < self.capacity
             elif (
                 self.participants_enroll_state == ParticipantEnrollment.State.SUBSTITUTE
             ):
-                return len(self.all_possible_participants()) < self.capacity
+                return self.all_possible_enrollments().count() < self.capacity
             raise NotImplementedError
         return True
 
@@ -141,9 +181,10 @@ class OneTimeEvent(Event):
 
     def substitute_enrollments_2_capacity(self):
         enrollments = self.substitute_enrollments().order_by("created_datetime")
-        take = len(enrollments)
-        if self.capacity is not None:
-            take = self.capacity - len(self.approved_participants())
+        if self.capacity is None:
+            return enrollments
+
+        take = max(self.capacity - self.approved_enrollments().count(), 0)
         return enrollments[:take]
 
     def can_unenroll_organizer(self, person):
@@ -151,11 +192,6 @@ class OneTimeEvent(Event):
             person, OneTimeEventOccurrence.can_unenroll_position
         )
 
-    def can_enroll_organizer(self, person):
-        return self.can_enroll_unenroll_organizer(
-            person, OneTimeEventOccurrence.can_enroll_position
-        )
-
     def is_organizer(self, person):
         return OrganizerOccurrenceAssignment.objects.filter(
             occurrence__event=self, person=person
@@ -227,13 +263,20 @@ class OneTimeEvent(Event):
 
     @staticmethod
     def get_available_events_by_participant(person):
+        if person is None:
+            return OneTimeEvent.objects.none()
+
         enrolled_events_id = OneTimeEventParticipantEnrollment.objects.filter(
             person=person
         ).values_list("one_time_event", flat=True)
 
-        available_events = OneTimeEvent.objects.exclude(id__in=enrolled_events_id)
-
-        return [e for e in available_events if e.can_person_enroll_as_waiting(person)]
+        return (
+            OneTimeEvent.objects.filter(
+                participanteligibility__person=person, date_end__gte=today()
+            )
+            .exclude(capacity=0)
+            .exclude(id__in=enrolled_events_id)
+        )
 
     @staticmethod
     def get_available_events_by_organizer(person):
@@ -241,9 +284,19 @@ class OneTimeEvent(Event):
             date__gte=today(), organizers=person
         ).all()
 
-        available_events = OneTimeEvent.objects.exclude(id__in=enrolled_events_id)
+        available_events = OneTimeEvent.objects.exclude(
+            id__in=enrolled_events_id
+        ).prefetch_related("eventpositionassignment_set", "eventoccurrence_set")
+
+        positions_matrix = OneTimeEvent.positions_requirements_matrix(
+            available_events, [person]
+        )
 
-        return [e for e in available_events if e.can_enroll_organizer(person)]
+        return [
+            e
+            for e in available_events
+            if e.can_enroll_organizer(person, positions_matrix[e.pk])
+        ]
 
 
 class OrganizerOccurrenceAssignment(OrganizerAssignment):
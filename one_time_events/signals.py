@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.db.transaction import on_commit
+
+from events.models import ParticipantEligibility
+from persons.models import Person
+from trainings.models import TrainingParticipantEnrollment
+from vzs.utils import today
+
+from .models import OneTimeEvent
+
+
+def training_enrollment_changed(sender, instance, raw=False, **kwargs):
+    """
+    Refreshes the eligibility of a person for one-time events
+    that require attending a training of some category.
+    """
+
+    if raw:
+        return
+
+    # deferred as the person might be being deleted together with the enrollment
+    on_commit(
+        lambda: ParticipantEligibility.refresh(
+            events=OneTimeEvent.objects.filter(
+                training_category__isnull=False, date_end__gte=today()
+            ),
+            persons=Person.objects.filter(pk=instance.person_id),
+        )
+    )
+
+
+def connect_signals():
+    post_save.connect(
+        training_enrollment_changed,
+        sender=TrainingParticipantEnrollment,
+        dispatch_uid="training_enrollment_saved",
+    )
+    post_delete.connect(
+        training_enrollment_changed,
+        sender=TrainingParticipantEnrollment,
+        dispatch_uid="training_enrollment_deleted",
+    )
@@ -203,15 +203,14 @@ class OneTimeEventListView(LoginRequiredMixin, generic.ListView):
         ).values_list("occurrence__event", flat=True)
         enrolled_events_organizers = set(enrolled_events_organizers)
 
-        enrolled_events = OneTimeEvent.objects.filter(
-            Q(onetimeeventparticipantenrollment__person=active_person)
-            | Q(pk__in=enrolled_events_organizers)
-        ).distinct()
-
-        for enrolled_event in enrolled_events:
-            enrolled_event.active_person_enrollment = (
-                enrolled_event.get_participant_enrollment(active_person)
+        enrolled_events = (
+            OneTimeEvent.objects.filter(
+                Q(onetimeeventparticipantenrollment__person=active_person)
+                | Q(pk__in=enrolled_events_organizers)
             )
+            .distinct()
+            .with_person_status(active_person)
+        )
 
         visible_event_pks = [
             event.pk
@@ -242,15 +241,13 @@ class OneTimeEventListView(LoginRequiredMixin, generic.ListView):
 
         active_person = self.request.active_person
 
-        enrolled_events = OneTimeEvent.get_upcoming_by_participant(active_person)
-        for event in enrolled_events:
-            event.enrollment = event.get_participant_enrollment(active_person)
+        enrolled_events = OneTimeEvent.get_upcoming_by_participant(
+            active_person
+        ).with_person_status(active_person)
 
         substitute_events = OneTimeEvent.get_upcoming_by_participant(
             active_person, ParticipantEnrollment.State.SUBSTITUTE
-        )
-        for event in substitute_events:
-            event.enrollment = event.get_participant_enrollment(active_person)
+        ).with_person_status(active_person)
 
         available_events = OneTimeEvent.get_available_events_by_participant(
             active_person
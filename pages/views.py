@@ -65,11 +65,15 @@ class HomeView(LoginRequiredMixin, TemplateView):
 
         kwargs.setdefault(
             "upcoming_trainings_participant",
-            TrainingOccurrence.get_upcoming_by_participant(active_person).all()[:5],
+            TrainingOccurrence.get_upcoming_by_participant(
+                active_person
+            ).select_related("event")[:5],
         )
         kwargs.setdefault(
             "upcoming_trainings_coach",
-            TrainingOccurrence.get_upcoming_by_coach(active_person).all()[:5],
+            TrainingOccurrence.get_upcoming_by_coach(active_person).select_related(
+                "event"
+            )[:5],
         )
 
         kwargs.setdefault(
@@ -100,7 +104,7 @@ class HomeView(LoginRequiredMixin, TemplateView):
             feature__feature_type=feature_type,
             date_expire__lte=today() + timedelta(days=days),
             date_returned__isnull=True,
-        ).all()
+        ).select_related("feature")
 
 
 class PageDetailView(LoginRequiredMixin, DetailView):
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:02
+
+from django.db import migrations, models
+
+from vzs.utils import normalize_search_text
+
+
+def fill_search_names(apps, schema_editor):
+    Person = apps.get_model("persons", "Person")
+
+    persons = list(Person.objects.only("first_name", "last_name"))
+    for person in persons:
+        person.search_name = normalize_search_text(
+            f"{person.first_name} {person.last_name}"
+        )
+
+    Person.objects.bulk_update(persons, ["search_name"], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX persons_person_search_name_trgm "
+        "ON persons_person USING gin (search_name gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS persons_person_search_name_trgm")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("persons", "0008_alter_person_options_alter_personhourlyrate_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="person",
+            name="search_name",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=101
+            ),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
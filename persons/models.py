@@ -8,6 +8,7 @@ from django.db.models import (
     Case,
     CharField,
     DateField,
+    DateTimeField,
     EmailField,
     ExpressionWrapper,
     ForeignKey,
@@ -17,6 +18,7 @@ from django.db.models import (
     Model,
     PositiveIntegerField,
     Q,
+    QuerySet,
     TextChoices,
     Value,
     When,
@@ -27,10 +29,65 @@ from django.utils.translation import gettext_lazy as _
 
 from features.models import Feature, FeatureAssignment
 from vzs.models import ExportableCSVMixin, RenderableModelMixin
-from vzs.utils import today
+from vzs.utils import normalize_search_text, today
 
 
-class PersonsManager(Manager):
+def person_search_q(text):
+    """
+    Returns a ``Q`` object matching the persons whose names contain
+    all the words of ``text``, ignoring case and diacritics.
+    """
+
+    q = Q()
+    for word in normalize_search_text(text).split():
+        q &= Q(search_name__contains=word)
+
+    return q
+
+
+class PersonQuerySet(QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """:meta private:"""
+
+        objs = list(objs)
+        for person in objs:
+            person.update_search_name()
+
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def order_by_search_rank(self, text):
+        """
+        Orders the persons by how well their names match ``text``.
+
+        The exact matches come first, then the names with a word
+        starting with ``text`` and then the other persons,
+        each group ordered by the last and the first name.
+        """
+
+        text = normalize_search_text(text)
+
+        return self.annotate(
+            search_rank=Case(
+                When(search_name=text, then=Value(2)),
+                When(
+                    Q(search_name__startswith=text)
+                    | Q(search_name__contains=f" {text}"),
+                    then=Value(1),
+                ),
+                default=Value(0),
+            )
+        ).order_by("-search_rank", "last_name", "first_name")
+
+    def search(self, text):
+        """
+        Filters the persons matching ``text`` by :func:`person_search_q`
+        and orders them by :meth:`order_by_search_rank`.
+        """
+
+        return self.filter(person_search_q(text)).order_by_search_rank(text)
+
+
+class PersonsManager(Manager.from_queryset(PersonQuerySet)):
     def get_queryset(self):
         return super().get_queryset().exclude(is_deleted=True)
 
@@ -141,6 +198,18 @@ class Person(ExportableCSVMixin, RenderableModelMixin, Model):
         "self", symmetrical=False, related_name="managed_by"
     )
     is_deleted = BooleanField(_("Smazáno"), default=False)
+    search_name = CharField(max_length=101, editable=False, db_index=True, default="")
+    """
+    The first and the last name normalized by :func:`vzs.utils.normalize_search_text`.
+
+    Kept in sync on save, on PostgreSQL it has a trigram index
+    for the substring searches of :func:`person_search_q`.
+    """
+    updated_at = DateTimeField(auto_now=True, null=True, db_index=True)
+    """
+    Time of the last change of the person or of their serialized relations,
+    used by the API to serve only the changed persons.
+    """
 
     csv_order = [
         "person_type",
@@ -179,6 +248,23 @@ class Person(ExportableCSVMixin, RenderableModelMixin, Model):
     def get_absolute_url(self):
         return reverse("persons:detail", kwargs={"pk": self.pk})
 
+    def update_search_name(self):
+        self.search_name = normalize_search_text(f"{self.first_name} {self.last_name}")
+
+    def save(self, *args, **kwargs):
+        self.update_search_name()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = {*update_fields, "updated_at"}
+
+            if {"first_name", "last_name"} & update_fields:
+                update_fields.add("search_name")
+
+            kwargs["update_fields"] = update_fields
+
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -11,7 +11,7 @@ from .models import Person
 class PersonSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = Person
-        fields = "__all__"
+        exclude = ["search_name"]
         extra_kwargs = {
             "url": {"view_name": "api:person-detail"},
         }
@@ -5,7 +5,7 @@ from django.shortcuts import redirect
 
 from events.models import Event
 from features.models import Feature, FeatureAssignment
-from persons.models import Person, PersonHourlyRate
+from persons.models import Person, PersonHourlyRate, person_search_q
 
 
 class PersonsFilter(TypedDict, total=False):
@@ -15,10 +15,7 @@ class PersonsFilter(TypedDict, total=False):
     Use with :func:`vzs.utils.filter_queryset`.
     """
 
-    name: Annotated[
-        str,
-        lambda name: Q(first_name__icontains=name) | Q(last_name__icontains=name),
-    ]
+    name: Annotated[str, lambda name: person_search_q(name)]
     email: Annotated[str, lambda email: Q(email__icontains=email)]
     qualification: Annotated[
         int,
@@ -47,9 +44,7 @@ class PersonsFilter(TypedDict, total=False):
     event_id: Annotated[
         int,
         lambda event_id: Q(
-            id__in=[
-                p.pk for p in Event.objects.get(pk=event_id).approved_participants()
-            ]
+            pk__in=Event.objects.get(pk=event_id).approved_participants().values("pk")
         ),
     ]
 
@@ -116,7 +111,7 @@ def anonymize_person(person):
     Anonymizes ``person`` by clearing all data about the person
     except settled transactions.
 
-    This does not delete the person.
+    This does not delete the person, but the API reports the person as deleted.
     """
 
     # Features
@@ -97,7 +97,8 @@ class PersonIndexView(PersonPermissionMixin, ListView):
 
     def get_queryset(self):
         """
-        Orders the persons by their last name.
+        Orders the persons by their last name,
+        or by the relevance when searching by the name.
         """
 
         persons_objects = self._filter_queryset_by_permission(Person.objects.with_age())
@@ -105,10 +106,12 @@ class PersonIndexView(PersonPermissionMixin, ListView):
         self.filter_form = PersonsFilterForm(self.request.GET)
 
         filter_dict = self.request.GET if self.filter_form.is_valid() else None
+        persons_objects = filter_queryset(persons_objects, filter_dict, PersonsFilter)
 
-        return filter_queryset(persons_objects, filter_dict, PersonsFilter).order_by(
-            "last_name"
-        )
+        if filter_dict is not None and filter_dict.get("name"):
+            return persons_objects.order_by_search_rank(filter_dict["name"])
+
+        return persons_objects.order_by("last_name")
 
 
 class PersonDetailView(
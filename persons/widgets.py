@@ -2,10 +2,16 @@ from django_select2.forms import ModelSelect2Widget
 
 
 class PersonSelectWidget(ModelSelect2Widget):
-    search_fields = [
-        "first_name__icontains",
-        "last_name__icontains",
-    ]
+    search_fields = ["search_name__contains"]
+
+    def filter_queryset(self, request, term, queryset=None, **dependent_fields):
+        """
+        Searches the persons by :meth:`persons.models.PersonQuerySet.search`.
+        """
+
+        queryset = super().filter_queryset(request, "", queryset, **dependent_fields)
+
+        return queryset.search(term)
 
     def label_from_instance(self, person):
         if person.date_of_birth is None:
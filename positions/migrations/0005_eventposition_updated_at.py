@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("positions", "0004_alter_eventposition_group"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventposition",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
@@ -1,7 +1,10 @@
+from collections import defaultdict
+
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db.models import (
     SET_NULL,
     CharField,
+    DateTimeField,
     ForeignKey,
     ManyToManyField,
     Model,
@@ -13,7 +16,7 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from events.models import Event
-from events.utils import check_common_requirements
+from events.utils import common_requirements_matrix
 from features.models import Feature, FeatureAssignment
 
 
@@ -44,6 +47,7 @@ class EventPosition(Model):
         "groups.Group", verbose_name=_("Skupina"), null=True, on_delete=SET_NULL
     )
     allowed_person_types = ManyToManyField("events.EventPersonTypeConstraint")
+    updated_at = DateTimeField(auto_now=True, null=True, db_index=True)
 
     def required_qualifications(self):
         return self.required_features.filter(feature_type=Feature.Type.QUALIFICATION)
@@ -57,34 +61,96 @@ class EventPosition(Model):
     def events_using(self):
         return Event.objects.filter(positions__id__contains=self.id)
 
-    def does_person_satisfy_requirements(self, person, date):
-        if not check_common_requirements(self, person):
-            return False
-
-        features = self.required_features
-
-        feature_type_conditions = [
-            Q(feature_type=Feature.Type.QUALIFICATION),
-            Q(feature_type=Feature.Type.PERMISSION),
-            Q(feature_type=Feature.Type.EQUIPMENT),
-        ]
+    @staticmethod
+    def requirements_matrix(positions_on_dates, persons):
+        """
+        Batch version of :meth:`does_person_satisfy_requirements`.
+
+        ``positions_on_dates`` is an iterable of ``(position, date)`` pairs.
+        ``persons`` may be a queryset or an iterable of persons.
+
+        Returns a mapping of each ``(position.pk, date)`` pair to the set
+        of primary keys of persons satisfying the requirements of the position
+        on the date.
+
+        Issues at most five queries regardless of the number of positions,
+        dates and persons.
+        """
+
+        positions_on_dates = list(positions_on_dates)
+
+        matrix = {(position.pk, date): set() for position, date in positions_on_dates}
+
+        if not positions_on_dates:
+            return matrix
+
+        positions = list(
+            {position.pk: position for position, _ in positions_on_dates}.values()
+        )
+        dates = [date for _, date in positions_on_dates]
+
+        common = common_requirements_matrix(positions, persons)
+
+        # position -> feature type -> required features of the type
+        required_features = defaultdict(lambda: defaultdict(set))
+
+        for (
+            position_pk,
+            feature_pk,
+            feature_type,
+        ) in EventPosition.required_features.through.objects.filter(
+            eventposition__in=[position.pk for position in positions]
+        ).values_list(
+            "eventposition_id", "feature_id", "feature__feature_type"
+        ):
+            required_features[position_pk][feature_type].add(feature_pk)
+
+        # person -> list of (feature, date assigned, date of expiry)
+        held_features = defaultdict(list)
+
+        feature_pks = set().union(
+            *(
+                features
+                for features_by_type in required_features.values()
+                for features in features_by_type.values()
+            )
+        )
+
+        if feature_pks:
+            for assignment in FeatureAssignment.objects.filter(
+                Q(feature__in=feature_pks)
+                & Q(person__in=set().union(*common.values()))
+                & Q(date_assigned__lte=max(dates))
+                & Q(date_returned=None)
+                & (Q(date_expire=None) | Q(date_expire__gte=min(dates)))
+            ).values_list("person_id", "feature_id", "date_assigned", "date_expire"):
+                held_features[assignment[0]].append(assignment[1:])
+
+        for position, date in positions_on_dates:
+            features_by_type = required_features[position.pk].values()
+
+            for person_pk in common[position.pk]:
+                valid_features = {
+                    feature_pk
+                    for feature_pk, date_assigned, date_expire in held_features[
+                        person_pk
+                    ]
+                    if date_assigned <= date
+                    and (date_expire is None or date_expire >= date)
+                }
+
+                if all(features & valid_features for features in features_by_type):
+                    matrix[position.pk, date].add(person_pk)
+
+        return matrix
 
-        for condition in feature_type_conditions:
-            observed_features = features.filter(condition)
-
-            if observed_features.exists():
-                assignment = FeatureAssignment.objects.filter(
-                    Q(feature__in=observed_features)
-                    & Q(person=person)
-                    & Q(date_assigned__lte=date)
-                    & Q(date_returned=None)
-                    & (Q(date_expire=None) | Q(date_expire__gte=date))
-                ).first()
-
-                if assignment is None:
-                    return False
-
-        return True
+    def does_person_satisfy_requirements(self, person, date):
+        return (
+            person.pk
+            in EventPosition.requirements_matrix([(self, date)], [person])[
+                self.pk, date
+            ]
+        )
 
     def __str__(self):
         return self.name
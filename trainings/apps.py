@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class TrainingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "trainings"
+
+    def ready(self):
+        """
+        Hooks the maintenance of
+        :class:`trainings.models.TrainingWeekdayEnrollmentCount`
+        to the model signals.
+        """
+
+        from .signals import connect_signals
+
+        connect_signals()
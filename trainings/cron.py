@@ -3,3 +3,7 @@ from django.core.management import call_command
 
 def unclosed_trainings_send_mails():
     call_command("check_unclosed_trainings")
+
+
+def enrollment_counts_repair():
+    call_command("check_enrollment_counts", "--repair")
@@ -3,7 +3,8 @@ from datetime import timedelta, timezone
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Div, Submit, HTML
 from django import forms
-from django.db.models import Q, QuerySet
+from django.db.models import Q, QuerySet, prefetch_related_objects
+from django.db.transaction import atomic
 from django.forms import ModelForm, Form, ChoiceField, IntegerField, ModelChoiceField
 from django.utils import timezone
 from django.utils.timezone import localdate
@@ -40,6 +41,7 @@ from vzs.utils import (
     combine_date_and_time,
     date_pretty,
     send_notification_email,
+    send_notification_emails,
     time_pretty,
     filter_queryset,
     now,
@@ -54,6 +56,7 @@ from .models import (
     TrainingParticipantAttendance,
     TrainingParticipantEnrollment,
     TrainingReplaceabilityForParticipants,
+    TrainingWeekdayEnrollmentCount,
     TrainingWeekdays,
 )
 
@@ -114,6 +117,65 @@ class TrainingParticipantEnrollmentUpdateAttendanceProvider:
                 if attendance is not None:
                     attendance.delete()
 
+    def participant_enrollments_update_attendance(self, training, enrollments):
+        """
+        Bulk variant of :meth:`participant_enrollment_update_attendance`
+        for approved ``enrollments`` of ``training`` with prefetched weekdays.
+
+        Reads the attendances of all the open occurrences at once
+        and writes the changes with a constant number of queries.
+        """
+
+        occurrences = list(
+            TrainingOccurrence.objects.filter(
+                event=training, state=EventOrOccurrenceState.OPEN
+            )
+        )
+        enrollments_weekdays = {
+            enrollment.person_id: (
+                enrollment,
+                {weekday.weekday for weekday in enrollment.weekdays.all()},
+            )
+            for enrollment in enrollments
+        }
+        attendances = {
+            (attendance.occurrence_id, attendance.person_id): attendance
+            for attendance in TrainingParticipantAttendance.objects.filter(
+                occurrence__in=occurrences, person__in=enrollments_weekdays.keys()
+            )
+        }
+
+        attendances_2_create = []
+        attendances_2_update = []
+        attendances_2_delete = []
+        for occurrence in occurrences:
+            for person_id, (enrollment, weekdays) in enrollments_weekdays.items():
+                attendance = attendances.get((occurrence.pk, person_id))
+                if occurrence.weekday() in weekdays:
+                    if attendance is None:
+                        attendances_2_create.append(
+                            TrainingParticipantAttendance(
+                                enrollment=enrollment,
+                                person_id=person_id,
+                                occurrence=occurrence,
+                                state=TrainingAttendance.PRESENT,
+                            )
+                        )
+                    else:
+                        attendance.enrollment = enrollment
+                        attendance.state = TrainingAttendance.PRESENT
+                        attendances_2_update.append(attendance)
+                elif attendance is not None:
+                    attendances_2_delete.append(attendance.pk)
+
+        TrainingParticipantAttendance.objects.bulk_create(attendances_2_create)
+        TrainingParticipantAttendance.objects.bulk_update(
+            attendances_2_update, ["enrollment", "state"]
+        )
+        TrainingParticipantAttendance.objects.filter(
+            pk__in=attendances_2_delete
+        ).delete()
+
 
 class TrainingForm(
     CoachAssignmentUpdateAttendanceProvider,
@@ -274,36 +336,50 @@ class TrainingForm(
         return self.cleaned_data
 
     def save(self, commit=True):
-        instance = super().save(False)
+        with atomic():
+            instance = super().save(False)
 
-        if commit:
-            instance.save()
+            if commit:
+                instance.save()
 
-        children = instance.occurrences_list()
-        new_datetimes = []
-        for date_raw in self.cleaned_data["day"]:
-            datetime_start, datetime_end = self._create_training_datetime(date_raw)
-            new_datetimes.append((datetime_start, datetime_end))
+            new_datetimes = {}
+            for date_raw in self.cleaned_data["day"]:
+                datetime_start, datetime_end = self._create_training_datetime(date_raw)
+                new_datetimes[datetime_start.date()] = (datetime_start, datetime_end)
 
-        for child in children:
-            datetimes = (
-                timezone.localtime(child.datetime_start),
-                timezone.localtime(child.datetime_end),
-            )
-            if datetimes in new_datetimes:
-                new_datetimes.remove(datetimes)
-            elif commit:
-                TrainingOccurrence.objects.filter(id=child.id).delete()
+            removed_occurrences = []
+            moved_occurrences = []
+            for child in instance.occurrences_list():
+                datetimes = new_datetimes.pop(
+                    timezone.localtime(child.datetime_start).date(), None
+                )
 
-        self._save_add_trainings(instance, new_datetimes, commit)
-        weekdays = self.cleaned_data["weekdays"]
-        if commit:
-            for (
-                participant_enrollment
-            ) in instance.trainingparticipantenrollment_set.all():
-                for weekday_attending_obj in participant_enrollment.weekdays.all():
-                    if weekday_attending_obj.weekday not in weekdays:
-                        weekday_attending_obj.delete()
+                if datetimes is None:
+                    removed_occurrences.append(child.id)
+                elif datetimes != (child.datetime_start, child.datetime_end):
+                    # the time changed, keep the occurrence with its attendance
+                    child.datetime_start, child.datetime_end = datetimes
+                    moved_occurrences.append(child)
+
+            if commit:
+                TrainingOccurrence.objects.filter(id__in=removed_occurrences).delete()
+                TrainingOccurrence.objects.bulk_update(
+                    moved_occurrences, ["datetime_start", "datetime_end"]
+                )
+
+            self._save_add_trainings(instance, list(new_datetimes.values()), commit)
+
+            if commit:
+                # deleted in bulk without the m2m signals,
+                # so the counters of the removed weekdays are deleted as well
+                TrainingParticipantEnrollment.weekdays.through.objects.filter(
+                    trainingparticipantenrollment__training=instance
+                ).exclude(
+                    trainingweekdays__weekday__in=self.cleaned_data["weekdays"]
+                ).delete()
+                TrainingWeekdayEnrollmentCount.objects.filter(
+                    training=instance
+                ).exclude(weekday__in=self.cleaned_data["weekdays"]).delete()
 
         return instance
 
@@ -312,25 +388,66 @@ class TrainingForm(
             event.state = EventOrOccurrenceState.OPEN
             if commit:
                 event.save()
-        for datetime_start, datetime_end in new_dates:
-            occurrence = TrainingOccurrence(
+
+        occurrences = [
+            TrainingOccurrence(
                 event=event,
                 state=EventOrOccurrenceState.OPEN,
                 datetime_start=datetime_start,
                 datetime_end=datetime_end,
             )
-            if commit:
+            for datetime_start, datetime_end in new_dates
+        ]
+
+        if commit and occurrences:
+            for occurrence in occurrences:
                 occurrence.save()
-                for coach_assignment in event.coachpositionassignment_set.all():
-                    super().coach_assignment_update_attendance(
-                        coach_assignment, event, [occurrence]
-                    )
-                for (
-                    participant_enrollment
-                ) in event.trainingparticipantenrollment_set.all():
-                    super().participant_enrollment_update_attendance(
-                        participant_enrollment, [occurrence]
-                    )
+
+            self._create_attendance(event, occurrences)
+
+    @staticmethod
+    def _create_attendance(event, occurrences):
+        """
+        Creates the attendance of the coaches and the approved participants
+        of the ``event`` for the newly created ``occurrences``.
+
+        The participant attendance is created in bulk. The coach assignments
+        use multi-table inheritance, which ``bulk_create`` doesn't support,
+        so they are created one by one.
+        """
+
+        coach_assignments = event.coachpositionassignment_set.all()
+        enrollments = event.trainingparticipantenrollment_set.filter(
+            state=ParticipantEnrollment.State.APPROVED
+        ).prefetch_related("weekdays")
+
+        enrollments_weekdays = [
+            (enrollment, {weekday.weekday for weekday in enrollment.weekdays.all()})
+            for enrollment in enrollments
+        ]
+
+        for occurrence in occurrences:
+            for coach_assignment in coach_assignments:
+                CoachOccurrenceAssignment.objects.create(
+                    position_assignment_id=coach_assignment.position_assignment_id,
+                    person_id=coach_assignment.person_id,
+                    occurrence=occurrence,
+                    state=TrainingAttendance.PRESENT,
+                )
+
+        TrainingParticipantAttendance.objects.bulk_create(
+            [
+                TrainingParticipantAttendance(
+                    enrollment=enrollment,
+                    person_id=enrollment.person_id,
+                    occurrence=occurrence,
+                    state=TrainingAttendance.PRESENT,
+                )
+                for occurrence in occurrences
+                for enrollment, weekdays in enrollments_weekdays
+                if occurrence.weekday() in weekdays
+            ]
+        )
 
     def _create_training_datetime(self, date_raw):
         date = parse_czech_date(date_raw)
@@ -489,15 +606,20 @@ class InitializeWeekdaysProvider:
 
 
 class TrainingEnrollmentStateChangedSendMailProvider:
-    def enrollment_state_changed_send_mail(self, enrollment):
+    def enrollment_state_changed_mail(self, enrollment):
+        """
+        Returns the subject, the message and the recipients of the notification
+        about the current state of ``enrollment``.
+        """
+
         if enrollment.state == ParticipantEnrollment.State.APPROVED:
-            send_notification_email(
+            return (
                 _("Změna stavu přihlášky"),
                 _(f"Vaše přihláška na trénink {enrollment.event} byla schválena"),
                 [enrollment.person],
             )
         elif enrollment.state == ParticipantEnrollment.State.SUBSTITUTE:
-            send_notification_email(
+            return (
                 _("Změna stavu přihlášky"),
                 _(
                     f"Vaší přihlášce na trénink {enrollment.event} byl změněn stav na NÁHRADNÍK"
@@ -505,7 +627,7 @@ class TrainingEnrollmentStateChangedSendMailProvider:
                 [enrollment.person],
             )
         elif enrollment.state == ParticipantEnrollment.State.REJECTED:
-            send_notification_email(
+            return (
                 _("Odmítnutí účasti"),
                 _(f"Na tréninku {enrollment.event} vám byla zakázána účast"),
                 [enrollment.person],
@@ -513,6 +635,20 @@ class TrainingEnrollmentStateChangedSendMailProvider:
         else:
             raise NotImplementedError
 
+    def enrollment_state_changed_send_mail(self, enrollment):
+        send_notification_email(*self.enrollment_state_changed_mail(enrollment))
+
+    def enrollments_state_changed_send_mails(self, enrollments):
+        """
+        Queues the notifications about the current state of ``enrollments``
+        at once, see :func:`vzs.utils.send_notification_emails`.
+        """
+
+        prefetch_related_objects(enrollments, "person__managed_by")
+        send_notification_emails(
+            [self.enrollment_state_changed_mail(e) for e in enrollments]
+        )
+
 
 class TrainingParticipantEnrollmentForm(
     TrainingWeekdaysSelectionMixin,
@@ -548,7 +684,7 @@ class TrainingParticipantEnrollmentForm(
             instance_weekdays_objs = instance.weekdays.all()
             for weekday_obj in instance_weekdays_objs:
                 if weekday_obj.weekday not in weekdays_cleaned:
-                    weekday_obj.delete()
+                    instance.weekdays.remove(weekday_obj)
                 else:
                     weekdays_cleaned.remove(weekday_obj.weekday)
 
@@ -735,12 +871,13 @@ class TrainingBulkApproveParticipantsForm(
         instance = super().save(False)
         enrollments_2_approve = instance.substitute_enrollments_2_capacity()
 
-        for enrollment in enrollments_2_approve:
-            enrollment.state = ParticipantEnrollment.State.APPROVED
-            super().enrollment_state_changed_send_mail(enrollment)
-            if commit:
-                enrollment.save()
-                super().participant_enrollment_update_attendance(enrollment)
+        if commit:
+            with atomic():
+                instance.approve_enrollments(enrollments_2_approve)
+                super().participant_enrollments_update_attendance(
+                    instance, enrollments_2_approve
+                )
+                super().enrollments_state_changed_send_mails(enrollments_2_approve)
 
         self.cleaned_data["count"] = len(enrollments_2_approve)
         return instance
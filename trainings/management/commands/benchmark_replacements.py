@@ -0,0 +1,104 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from events.models import ParticipantEnrollment
+from persons.models import Person
+from trainings.models import Training, TrainingOccurrence
+from vzs.commands_utils import positive_int
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the number of queries and the time spent finding the occurrences "
+        "persons can enroll in as a replacement occurrence by occurrence "
+        "and with a single query. Fails if the results or the query count differ "
+        "from the expected ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=positive_int,
+            default=10,
+            help="Number of occurrences to find for each person.",
+        )
+
+    def _measure(self, func):
+        connection.queries_log.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            result = func()
+            elapsed = perf_counter() - start
+
+        return result, len(context.captured_queries), elapsed
+
+    def _pairwise(self, person, trainings, count):
+        replaceable_trainings = list(trainings)
+
+        for training in trainings:
+            replaceable_trainings += training.replaces_training_list()
+
+        occurrences = TrainingOccurrence.objects.filter(
+            event__in=replaceable_trainings
+        ).exclude(participants=person)
+
+        return [
+            occurrence.pk
+            for occurrence in sorted(
+                occurrences, key=lambda o: (o.datetime_start, o.pk)
+            )
+            if occurrence.can_participant_enroll(person)
+        ][:count]
+
+    def _single_query(self, person, trainings, count):
+        return [
+            occurrence.pk
+            for occurrence in TrainingOccurrence.get_replaceable_by_participant(
+                person, trainings
+            )[:count]
+        ]
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        failed = False
+
+        for person in Person.objects.filter(
+            trainingparticipantenrollment__state=ParticipantEnrollment.State.APPROVED
+        ).distinct():
+            trainings = list(
+                Training.get_unfinished_trainings_by_participant(
+                    person, ParticipantEnrollment.State.APPROVED
+                )
+            )
+
+            pairwise, pairwise_queries, pairwise_time = self._measure(
+                lambda: self._pairwise(person, trainings, count)
+            )
+            single, single_queries, single_time = self._measure(
+                lambda: self._single_query(person, trainings, count)
+            )
+
+            if pairwise != single or single_queries != 1:
+                failed = True
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{person}: expected {pairwise}, got {single} "
+                        f"in {single_queries} queries."
+                    )
+                )
+                continue
+
+            self.stdout.write(
+                f"{person} ({len(single)} occurrences): "
+                f"pairwise {pairwise_queries} queries in {pairwise_time:.3f} s, "
+                f"single {single_queries} queries in {single_time:.3f} s"
+            )
+
+        if failed:
+            raise CommandError("Benchmark found differences.")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
@@ -0,0 +1,186 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from events.models import EventOrOccurrenceState, ParticipantEnrollment
+from persons.models import Person
+from trainings.forms import TrainingBulkApproveParticipantsForm
+from trainings.models import (
+    Training,
+    TrainingParticipantAttendance,
+    TrainingParticipantEnrollment,
+    TrainingWeekdayEnrollmentCount,
+    TrainingWeekdays,
+)
+from vzs.commands_utils import positive_int
+from vzs.utils import now
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the number of queries and the time spent approving substitutes "
+        "of a training up to its capacity one by one and in bulk. "
+        "The substitutes are created for the benchmark and everything "
+        "is rolled back afterwards. Fails if the results differ."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--substitutes",
+            type=positive_int,
+            default=500,
+            help="Number of substitutes to create.",
+        )
+        parser.add_argument(
+            "--training",
+            type=int,
+            help="ID of the training, defaults to a training with open occurrences.",
+        )
+
+    def _measure(self, func):
+        # the one by one approval exceeds the limit of the query log
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = perf_counter()
+            func()
+            elapsed = perf_counter() - start
+
+        return len(queries), elapsed
+
+    def _get_training(self, training_id):
+        trainings = Training.objects.filter(
+            eventoccurrence__state=EventOrOccurrenceState.OPEN
+        ).distinct()
+
+        if training_id is not None:
+            trainings = Training.objects.filter(pk=training_id)
+
+        training = trainings.first()
+
+        if training is None:
+            raise CommandError("Could not find a training to benchmark.")
+
+        return training
+
+    def _create_substitutes(self, training, count):
+        weekdays = [TrainingWeekdays.get_or_create(w) for w in training.weekdays_list()]
+        persons = Person.objects.bulk_create(
+            Person(
+                email=f"benchmark-substitute-{i}@vzs.cz",
+                first_name="Náhradník",
+                last_name=str(i),
+                sex=Person.Sex.UNKNOWN,
+                person_type=Person.Type.EXTERNAL,
+            )
+            for i in range(count)
+        )
+
+        for i, person in enumerate(persons):
+            enrollment = TrainingParticipantEnrollment(
+                training=training,
+                person=person,
+                created_datetime=now(),
+                state=ParticipantEnrollment.State.SUBSTITUTE,
+            )
+            enrollment.save()
+            enrollment.weekdays.add(
+                *[w for j, w in enumerate(weekdays) if (i >> j) & 1]
+                or [weekdays[i % len(weekdays)]]
+            )
+
+    def _one_by_one(self, training):
+        form = TrainingBulkApproveParticipantsForm(instance=training)
+        free_spots = {
+            weekday: training.capacity
+            - training.trainingparticipantenrollment_set.filter(
+                state=ParticipantEnrollment.State.APPROVED,
+                weekdays__weekday=weekday,
+            ).count()
+            for weekday in training.weekdays_list()
+        }
+
+        for enrollment in training.substitute_enrollments().order_by(
+            "created_datetime", "pk"
+        ):
+            weekdays = [w.weekday for w in enrollment.weekdays.all()]
+            if not weekdays or any(free_spots.get(w, 0) <= 0 for w in weekdays):
+                continue
+
+            for weekday in weekdays:
+                free_spots[weekday] -= 1
+
+            enrollment.state = ParticipantEnrollment.State.APPROVED
+            form.enrollment_state_changed_send_mail(enrollment)
+            enrollment.save()
+            form.participant_enrollment_update_attendance(enrollment)
+
+    def _bulk(self, training):
+        form = TrainingBulkApproveParticipantsForm({}, instance=training)
+        form.is_valid()
+        form.save()
+
+    def _run(self, training, func):
+        """
+        Runs ``func`` in a savepoint which is rolled back,
+        returns the measurements and the resulting state of the training.
+        """
+
+        sid = transaction.savepoint()
+        training = Training.objects.get(pk=training.pk)
+        queries, elapsed = self._measure(lambda: func(training))
+
+        result = (
+            set(training.approved_enrollments().values_list("person", flat=True)),
+            set(
+                TrainingParticipantAttendance.objects.filter(
+                    occurrence__event=training
+                ).values_list("occurrence", "person", "enrollment", "state")
+            ),
+            {
+                key: count
+                for key, count in TrainingWeekdayEnrollmentCount.stored_counts().items()
+                if key[0] == training.pk
+            },
+        )
+        transaction.savepoint_rollback(sid)
+
+        return result, queries, elapsed
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            training = self._get_training(options["training"])
+            self._create_substitutes(training, options["substitutes"])
+
+            training.capacity = (
+                max(
+                    training.approved_enrollments_count_by_weekday(w)
+                    for w in training.weekdays_list()
+                )
+                + options["substitutes"] // 4
+            )
+            training.save()
+
+            one_by_one, one_by_one_queries, one_by_one_time = self._run(
+                training, self._one_by_one
+            )
+            bulk, bulk_queries, bulk_time = self._run(training, self._bulk)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{training} ({options['substitutes']} substitutes, "
+            f"{len(bulk[0])} approved): "
+            f"one by one {one_by_one_queries} queries in {one_by_one_time:.3f} s, "
+            f"bulk {bulk_queries} queries in {bulk_time:.3f} s"
+        )
+
+        if one_by_one != bulk:
+            raise CommandError("Benchmark found differences.")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
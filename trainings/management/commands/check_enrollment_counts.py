@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from trainings.models import TrainingWeekdayEnrollmentCount
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifies the counters of training enrollments by weekday and state "
+        "against the enrollments. Rebuilds the counters if --repair is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rebuild the counters if they differ from the enrollments.",
+        )
+
+    def handle(self, *args, **options):
+        expected = TrainingWeekdayEnrollmentCount.expected_counts()
+        stored = TrainingWeekdayEnrollmentCount.stored_counts()
+
+        differences = sorted(
+            (key, stored.get(key, 0), expected.get(key, 0))
+            for key in expected.keys() | stored.keys()
+            if stored.get(key, 0) != expected.get(key, 0)
+        )
+
+        for (training_id, weekday, state), stored_count, expected_count in differences:
+            self.stdout.write(
+                f"Training {training_id}, weekday {weekday}, state {state}: "
+                f"counted {stored_count}, expected {expected_count}"
+            )
+
+        if not differences:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"All {len(expected)} enrollment counters are correct."
+                )
+            )
+        elif options["repair"]:
+            TrainingWeekdayEnrollmentCount.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully repaired {len(differences)} enrollment counters."
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Found {len(differences)} incorrect enrollment counters."
+                )
+            )
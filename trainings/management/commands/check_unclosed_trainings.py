@@ -1,53 +1,62 @@
 import datetime
+from collections import defaultdict
 
-from django.core.management.base import BaseCommand
 from django.urls import reverse
 
 from events.models import EventOrOccurrenceState
-from trainings.models import TrainingOccurrence
-from users.utils import get_permission_by_codename
+from trainings.models import Training, TrainingOccurrence
+from users.utils import get_permission_holders
+from vzs.commands_utils import DigestCommand
 from vzs.settings import TRAINING_CLOSE_DEADLINE_DAYS
-from vzs.utils import get_server_url, date_pretty, send_notification_email
+from vzs.utils import get_server_url, date_pretty
 
 
-class Command(BaseCommand):
-    help = "Send notification about unclosed trainings."
+class Command(DigestCommand):
+    help = (
+        "Send notification about unclosed trainings. "
+        "Each coach and category administrator receives a single digest."
+    )
+    subject = "Upozornění na neuzavřené tréninky"
 
-    def handle(self, *args, **options):
+    def collect_digests(self):
         deadline = datetime.datetime.now() - datetime.timedelta(
             days=TRAINING_CLOSE_DEADLINE_DAYS
         )
-        unclosed_trainings = TrainingOccurrence.objects.filter(
-            state=EventOrOccurrenceState.OPEN, datetime_end__lt=deadline
+        unclosed_trainings = (
+            TrainingOccurrence.objects.filter(
+                state=EventOrOccurrenceState.OPEN, datetime_end__lt=deadline
+            )
+            .prefetch_related("coaches")
+            .order_by("datetime_start")
+        )
+        trainings = Training.objects.select_related(
+            "main_coach_assignment__person"
+        ).in_bulk({occurrence.event_id for occurrence in unclosed_trainings})
+        category_admins = get_permission_holders(
+            {training.category for training in trainings.values()}
         )
 
+        digests = defaultdict(list)
+
         for unclosed_training in unclosed_trainings:
+            training = trainings[unclosed_training.event_id]
             coaches = set(unclosed_training.coaches.all())
-            if unclosed_training.event.main_coach_assignment is not None:
-                main_coach = unclosed_training.event.main_coach_assignment.person
-                coaches.add(main_coach)
+            if training.main_coach_assignment is not None:
+                coaches.add(training.main_coach_assignment.person)
 
             url_address = get_server_url() + reverse(
                 "trainings:fill-attendance",
-                kwargs={
-                    "event_id": unclosed_training.event.id,
-                    "pk": unclosed_training.id,
-                },
+                kwargs={"event_id": training.id, "pk": unclosed_training.id},
             )
             date = date_pretty(unclosed_training.datetime_start)
-            send_notification_email(
-                "Upozornění na neuzavřený trénink",
-                f"Uzavřete trénink {unclosed_training.event} dne {date} na adrese {url_address}",
-                coaches,
-            )
-            category_admins = [
-                user.person
-                for user in get_permission_by_codename(
-                    unclosed_training.event.category
-                ).user_set.all()
-            ]
-            send_notification_email(
-                "Upozornění na neuzavřený trénink",
-                f"Upozorňujeme Vás jako správce událostí druhu {unclosed_training.event.get_category_display()}, že trénink {unclosed_training.event.name} dne {date} na adrese {url_address} není uzavřen.",
-                category_admins,
-            )
+
+            for coach in coaches:
+                digests[coach].append(
+                    f"Uzavřete trénink {training} dne {date} na adrese {url_address}"
+                )
+            for category_admin in category_admins.get(training.category, []):
+                digests[category_admin].append(
+                    f"Upozorňujeme Vás jako správce událostí druhu {training.get_category_display()}, že trénink {training.name} dne {date} na adrese {url_address} není uzavřen."
+                )
+
+        return digests
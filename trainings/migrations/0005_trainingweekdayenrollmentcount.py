@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:51
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_enrollment_weekdays(apps, schema_editor):
+    TrainingParticipantEnrollment = apps.get_model(
+        "trainings", "TrainingParticipantEnrollment"
+    )
+    TrainingWeekdayEnrollmentCount = apps.get_model(
+        "trainings", "TrainingWeekdayEnrollmentCount"
+    )
+
+    rows = TrainingParticipantEnrollment.weekdays.through.objects.values_list(
+        "trainingparticipantenrollment__training",
+        "trainingweekdays__weekday",
+        "trainingparticipantenrollment__state",
+    ).annotate(count=models.Count("pk"))
+
+    TrainingWeekdayEnrollmentCount.objects.bulk_create(
+        TrainingWeekdayEnrollmentCount(
+            training_id=training_id, weekday=weekday, state=state, count=count
+        )
+        for training_id, weekday, state, count in rows
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trainings", "0004_alter_training_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrainingWeekdayEnrollmentCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(6),
+                        ]
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("schvalen", "schválen"),
+                            ("nahradnik", "nahradník"),
+                            ("odmitnut", "odmítnut"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "training",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekday_enrollment_counts",
+                        to="trainings.training",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("training", "weekday", "state")},
+            },
+        ),
+        migrations.RunPython(count_enrollment_weekdays, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,24 @@
-from collections import defaultdict
+from collections import Counter
 from datetime import timedelta
 
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Q
+from django.db.models import (
+    BooleanField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce
+from django.db.transaction import atomic
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from polymorphic.managers import PolymorphicManager
+from polymorphic.query import PolymorphicQuerySet
 
 from events.models import (
     Event,
@@ -41,12 +54,32 @@ class TrainingReplaceabilityForParticipants(models.Model):
         unique_together = ["training_1", "training_2"]
 
 
+class TrainingQuerySet(PolymorphicQuerySet):
+    def with_person_status(self, person):
+        """
+        Annotates the trainings with the enrollment of ``person``:
+
+        *   ``participant_enrollment_id`` - ID of the participant enrollment
+            or ``None``
+        """
+
+        enrollments = TrainingParticipantEnrollment.objects.filter(
+            training=OuterRef("pk"), person=person
+        )
+
+        return self.annotate(
+            participant_enrollment_id=Subquery(enrollments.values("pk")[:1]),
+        )
+
+
 class Training(Event):
     class Category(models.TextChoices):
         CLIMBING = "lezecky", _("lezecký")
         SWIMMING = "plavecky", _("plavecký")
         MEDICAL = "zdravoveda", _("zdravověda")
 
+    objects = PolymorphicManager.from_queryset(TrainingQuerySet)()
+
     enrolled_participants = models.ManyToManyField(
         "persons.Person",
         through="trainings.TrainingParticipantEnrollment",
@@ -192,19 +225,48 @@ class Training(Event):
             weekday,
         )
 
+    def enrollments_count_by_weekday(self, weekday, states):
+        """
+        Returns the number of participant enrollments in one of ``states``
+        which include ``weekday``.
+
+        Reads the counters of :class:`TrainingWeekdayEnrollmentCount`,
+        which are loaded once per instance unless already prefetched.
+        """
+
+        prefetch_related_objects([self], "weekday_enrollment_counts")
+
+        return sum(
+            enrollment_count.count
+            for enrollment_count in self.weekday_enrollment_counts.all()
+            if enrollment_count.weekday == weekday and enrollment_count.state in states
+        )
+
+    def approved_enrollments_count_by_weekday(self, weekday):
+        return self.enrollments_count_by_weekday(
+            weekday, [ParticipantEnrollment.State.APPROVED]
+        )
+
+    def substitute_enrollments_count_by_weekday(self, weekday):
+        return self.enrollments_count_by_weekday(
+            weekday, [ParticipantEnrollment.State.SUBSTITUTE]
+        )
+
     def has_weekday_free_spot(self, weekday):
         possibly_free = super().has_free_spot()
         if not possibly_free:
             if self.participants_enroll_state == ParticipantEnrollment.State.APPROVED:
-                enrollments_length = self.approved_enrollments_by_weekday(
-                    weekday
-                ).count()
+                enrollments_length = self.approved_enrollments_count_by_weekday(weekday)
             elif (
                 self.participants_enroll_state == ParticipantEnrollment.State.SUBSTITUTE
             ):
-                enrollments_length = self.all_possible_enrollments_by_weekday(
-                    weekday
-                ).count()
+                enrollments_length = self.enrollments_count_by_weekday(
+                    weekday,
+                    [
+                        ParticipantEnrollment.State.APPROVED,
+                        ParticipantEnrollment.State.SUBSTITUTE,
+                    ],
+                )
             else:
                 raise NotImplementedError
             return enrollments_length < self.capacity
@@ -257,11 +319,6 @@ class Training(Event):
             person, TrainingOccurrence.can_unenroll_position
         )
 
-    def can_enroll_organizer(self, person):
-        return self.can_enroll_unenroll_organizer(
-            person, TrainingOccurrence.can_enroll_position
-        )
-
     def is_organizer(self, person):
         return (
             self.coaches.contains(person)
@@ -280,30 +337,66 @@ class Training(Event):
         )
 
     def substitute_enrollments_2_capacity(self):
-        enrollments = self.substitute_enrollments().order_by("created_datetime")
+        """
+        Returns the substitute enrollments which can be approved
+        without exceeding the capacity on any of their weekdays.
+
+        The substitutes are loaded once with their weekdays and persons
+        and chosen greedily in memory by the time of their creation.
+        """
+
+        enrollments = list(
+            self.substitute_enrollments()
+            .select_related("person")
+            .prefetch_related("weekdays")
+            .order_by("created_datetime", "pk")
+        )
         if self.capacity is None:
             return enrollments
 
-        enrolled_count = {}
-        for weekday in self.weekdays_list():
-            enrolled_count[weekday] = len(self.approved_enrollments_by_weekday(weekday))
+        free_spots = {
+            weekday: self.capacity - self.approved_enrollments_count_by_weekday(weekday)
+            for weekday in self.weekdays_list()
+        }
 
-        chosen_count = defaultdict(lambda: 0)
         chosen_enrollments = []
         for enrollment in enrollments:
-            fullness_vec = [
-                enrolled_count[w.weekday] for w in enrollment.weekdays.all()
-            ]
-            chosen_vec = [chosen_count[w.weekday] for w in enrollment.weekdays.all()]
-            if [x + y for x, y in zip(fullness_vec, chosen_vec)] < [
-                self.capacity
-            ] * len(fullness_vec):
+            weekdays = [w.weekday for w in enrollment.weekdays.all()]
+            if weekdays and all(free_spots.get(w, 0) > 0 for w in weekdays):
                 chosen_enrollments.append(enrollment)
-                for w in enrollment.weekdays.all():
-                    chosen_count[w.weekday] += 1
+                for weekday in weekdays:
+                    free_spots[weekday] -= 1
 
         return chosen_enrollments
 
+    def approve_enrollments(self, enrollments):
+        """
+        Approves ``enrollments`` of this training with a single ``UPDATE``.
+
+        The enrollments must have their weekdays prefetched. As ``bulk_update``
+        sends no signals, the weekday enrollment counters are moved
+        to the approved state here, in the same transaction.
+        """
+
+        moved_counts = Counter(
+            (self.pk, weekday.weekday, enrollment.state)
+            for enrollment in enrollments
+            for weekday in enrollment.weekdays.all()
+        )
+        approved_counts = Counter(
+            (self.pk, weekday.weekday, ParticipantEnrollment.State.APPROVED)
+            for enrollment in enrollments
+            for weekday in enrollment.weekdays.all()
+        )
+
+        for enrollment in enrollments:
+            enrollment.state = ParticipantEnrollment.State.APPROVED
+
+        with atomic():
+            TrainingParticipantEnrollment.objects.bulk_update(enrollments, ["state"])
+            TrainingWeekdayEnrollmentCount.change(moved_counts, -1)
+            TrainingWeekdayEnrollmentCount.change(approved_counts)
+
     def does_person_satisfy_position_requirements(self, person, position):
         return position.does_person_satisfy_requirements(person, self.date_start)
 
@@ -338,15 +431,20 @@ class Training(Event):
 
     @staticmethod
     def get_available_trainings_by_participant(person):
+        if person is None:
+            return Training.objects.none()
+
         enrolled_trainings_id = TrainingParticipantEnrollment.objects.filter(
             person=person
         ).values_list("training", flat=True)
 
-        available_trainings = Training.objects.exclude(id__in=enrolled_trainings_id)
-
-        return [
-            t for t in available_trainings if t.can_person_enroll_as_waiting(person)
-        ]
+        return (
+            Training.objects.filter(
+                participanteligibility__person=person, date_end__gte=today()
+            )
+            .exclude(capacity=0)
+            .exclude(id__in=enrolled_trainings_id)
+        )
 
 
 class CoachPositionAssignment(models.Model):
@@ -405,7 +503,49 @@ class CoachOccurrenceAssignment(OrganizerAssignment):
         unique_together = ["person", "occurrence"]
 
 
+class TrainingOccurrenceQuerySet(PolymorphicQuerySet):
+    def with_person_status(self, person):
+        """
+        Annotates the occurrences with the attendance of ``person``:
+
+        *   ``participant_excused`` - whether the person is an excused participant
+        *   ``is_one_time_presence`` - whether the person is a present participant
+            that is not enrolled in the training, e.g. a replacement
+        *   ``coach_excused`` - whether the person is not a present
+            or an unexcused coach, see :meth:`TrainingOccurrence.is_coach_excused`
+
+        Lists of occurrences can be rendered with the status of the person
+        without a query for each occurrence.
+        """
+
+        attendances = TrainingParticipantAttendance.objects.filter(
+            occurrence=OuterRef("pk"), person=person
+        )
+        enrollments = TrainingParticipantEnrollment.objects.filter(
+            training=OuterRef("event"), person=person
+        )
+        coach_assignments = CoachOccurrenceAssignment.objects.filter(
+            Q(state=TrainingAttendance.PRESENT) | Q(state=TrainingAttendance.UNEXCUSED),
+            occurrence=OuterRef("pk"),
+            person=person,
+        )
+
+        return self.annotate(
+            participant_excused=Exists(
+                attendances.filter(state=TrainingAttendance.EXCUSED)
+            ),
+            is_one_time_presence=ExpressionWrapper(
+                Exists(attendances.filter(state=TrainingAttendance.PRESENT))
+                & ~Exists(enrollments),
+                output_field=BooleanField(),
+            ),
+            coach_excused=~Exists(coach_assignments),
+        )
+
+
 class TrainingOccurrence(EventOccurrence):
+    objects = PolymorphicManager.from_queryset(TrainingOccurrenceQuerySet)()
+
     datetime_start = models.DateTimeField(_("Začíná"))
     datetime_end = models.DateTimeField(_("Končí"))
 
@@ -691,6 +831,91 @@ class TrainingOccurrence(EventOccurrence):
 
         return pre_filter.order_by("datetime_start")
 
+    @staticmethod
+    def get_replaceable_by_participant(person, trainings):
+        """
+        Returns the upcoming occurrences of ``trainings`` and of the trainings
+        replacing them, which ``person`` can enroll in as a replacement
+        for an excused attendance, ordered by their start.
+
+        Evaluates the same conditions as :meth:`can_participant_enroll`
+        in a single query, so slicing the result loads only the needed rows.
+        """
+
+        attendances = TrainingParticipantAttendance.objects.filter(person=person)
+
+        one_time_attendances_count = (
+            attendances.filter(enrollment=None)
+            .order_by()
+            .values("person")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+
+        # excused attendances of trainings started before the outer occurrence
+        earlier_excused = attendances.filter(
+            state=TrainingAttendance.EXCUSED,
+            occurrence__datetime_start__lt=OuterRef(OuterRef("datetime_start")),
+        )
+
+        # an excused attendance is not replaced yet if it is not among the first
+        # ones, which were used by the one-time attendances
+        excused_rank = (
+            earlier_excused.filter(pk__lte=OuterRef("pk"))
+            .order_by()
+            .values("person")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+
+        replaceable_excused = (
+            attendances.filter(
+                state=TrainingAttendance.EXCUSED,
+                occurrence__datetime_start__lt=OuterRef("datetime_start"),
+            )
+            .filter(
+                Q(occurrence__event=OuterRef("event"))
+                | Exists(
+                    TrainingReplaceabilityForParticipants.objects.filter(
+                        training_1=OuterRef("occurrence__event"),
+                        training_2=OuterRef(OuterRef("event")),
+                    )
+                )
+            )
+            .annotate(
+                rank=Subquery(excused_rank),
+                one_time_count=Coalesce(Subquery(one_time_attendances_count), 0),
+            )
+            .filter(rank__gt=F("one_time_count"))
+        )
+
+        present_count = (
+            TrainingParticipantAttendance.objects.filter(
+                occurrence=OuterRef("pk"), state=TrainingAttendance.PRESENT
+            )
+            .order_by()
+            .values("occurrence")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+
+        return (
+            TrainingOccurrence.objects.filter(
+                Q(event__in=trainings)
+                | Q(event__training__replaceable_training_2__training_1__in=trainings),
+                datetime_start__gte=now()
+                + timedelta(days=settings.PARTICIPANT_ENROLL_DEADLINE_DAYS),
+            )
+            .exclude(participants=person)
+            .alias(present_count=Coalesce(Subquery(present_count), 0))
+            .filter(
+                Q(event__capacity=None) | Q(present_count__lt=F("event__capacity")),
+                Exists(replaceable_excused),
+            )
+            .distinct()
+            .order_by("datetime_start", "pk")
+        )
+
     @property
     def hours(self):
         td = self.datetime_end - self.datetime_start
@@ -742,7 +967,7 @@ class TrainingParticipantAttendance(models.Model):
 
         excused = observed.filter(
             state=TrainingAttendance.EXCUSED,
-            occurrence__datetime_start__lt=datetime_start
+            occurrence__datetime_start__lt=datetime_start,
             # occurrence__state = EventOrOccurrenceState.COMPLETED
         )
         one_time_attendances = observed.filter(enrollment=None)
@@ -774,6 +999,12 @@ class TrainingParticipantEnrollment(ParticipantEnrollment):
     class Meta:
         unique_together = ["training", "person"]
 
+    def save(self, *args, **kwargs):
+        # the save signals move the weekday enrollment counters
+        # to the new state, see :mod:`trainings.signals`
+        with atomic():
+            super().save(*args, **kwargs)
+
     def attends_on_weekday(self, weekday):
         try:
             self.weekdays.get(weekday=weekday)
@@ -811,3 +1042,123 @@ class TrainingWeekdays(models.Model):
         return TrainingWeekdays.objects.get_or_create(
             weekday=weekday, defaults={"weekday": weekday}
         )[0]
+
+
+class TrainingWeekdayEnrollmentCount(models.Model):
+    """
+    Number of participant enrollments of a training in a state
+    which include a weekday.
+
+    Kept up to date by the handlers in :mod:`trainings.signals`
+    in the same transaction as the enrollment changes,
+    verified and repaired by the ``check_enrollment_counts`` command.
+    """
+
+    training = models.ForeignKey(
+        "trainings.Training",
+        on_delete=models.CASCADE,
+        related_name="weekday_enrollment_counts",
+    )
+    weekday = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(0), MaxValueValidator(6)]
+    )
+    state = models.CharField(max_length=10, choices=ParticipantEnrollment.State.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ["training", "weekday", "state"]
+
+    @staticmethod
+    def counted_enrollment_weekdays(**filters):
+        """
+        Returns the ``(training ID, weekday, state)`` triples of the enrollment
+        weekdays matching ``filters``, one for each selected weekday.
+
+        ``filters`` are applied to the through model of
+        :attr:`TrainingParticipantEnrollment.weekdays`.
+        """
+
+        return TrainingParticipantEnrollment.weekdays.through.objects.filter(
+            **filters
+        ).values_list(
+            "trainingparticipantenrollment__training",
+            "trainingweekdays__weekday",
+            "trainingparticipantenrollment__state",
+        )
+
+    @staticmethod
+    def change(counts, sign=1):
+        """
+        Adds ``counts``, a mapping of ``(training ID, weekday, state)`` triples
+        to numbers of enrollments, to the counters, or subtracts them
+        if ``sign`` is ``-1``.
+
+        The counters are changed by a single ``UPDATE`` each,
+        so concurrent changes are not lost.
+        """
+
+        if not counts:
+            return
+
+        TrainingWeekdayEnrollmentCount.objects.bulk_create(
+            [
+                TrainingWeekdayEnrollmentCount(
+                    training_id=training_id, weekday=weekday, state=state
+                )
+                for training_id, weekday, state in counts
+            ],
+            ignore_conflicts=True,
+        )
+
+        for (training_id, weekday, state), count in counts.items():
+            TrainingWeekdayEnrollmentCount.objects.filter(
+                training_id=training_id, weekday=weekday, state=state
+            ).update(count=F("count") + sign * count)
+
+    @staticmethod
+    def expected_counts():
+        """
+        Returns the counts computed from the enrollments as a mapping
+        of ``(training ID, weekday, state)`` triples to numbers of enrollments.
+        """
+
+        rows = TrainingWeekdayEnrollmentCount.counted_enrollment_weekdays().annotate(
+            count=models.Count("pk")
+        )
+
+        return {
+            (training_id, weekday, state): count
+            for training_id, weekday, state, count in rows
+        }
+
+    @staticmethod
+    def stored_counts():
+        """
+        Returns the nonzero counters as a mapping
+        of ``(training ID, weekday, state)`` triples to numbers of enrollments.
+        """
+
+        rows = TrainingWeekdayEnrollmentCount.objects.exclude(count=0).values_list(
+            "training", "weekday", "state", "count"
+        )
+
+        return {
+            (training_id, weekday, state): count
+            for training_id, weekday, state, count in rows
+        }
+
+    @staticmethod
+    def rebuild():
+        """
+        Recomputes all the counters from the enrollments.
+        """
+
+        with atomic():
+            counts = TrainingWeekdayEnrollmentCount.expected_counts()
+            TrainingWeekdayEnrollmentCount.objects.all().delete()
+            TrainingWeekdayEnrollmentCount.objects.bulk_create(
+                TrainingWeekdayEnrollmentCount(
+                    training_id=training_id, weekday=weekday, state=state, count=count
+                )
+                for (training_id, weekday, state), count in counts.items()
+            )
@@ -0,0 +1,114 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_save, pre_delete, pre_save
+
+from .models import TrainingParticipantEnrollment, TrainingWeekdayEnrollmentCount
+
+_Weekdays = TrainingParticipantEnrollment.weekdays.through
+
+
+def _change_counts(sign, **filters):
+    TrainingWeekdayEnrollmentCount.change(
+        Counter(TrainingWeekdayEnrollmentCount.counted_enrollment_weekdays(**filters)),
+        sign,
+    )
+
+
+def enrollment_weekdays_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Updates the weekday enrollment counters when weekdays are added
+    to or removed from enrollments.
+
+    The counted weekdays are read from the database together with the state
+    of the enrollment, so unsaved changes of the enrollment are not counted.
+    """
+
+    if action == "post_add":
+        sign = 1
+    elif action in ["pre_remove", "pre_clear"]:
+        sign = -1
+    else:
+        return
+
+    if reverse:
+        filters = {"trainingweekdays": instance}
+
+        if pk_set is not None:
+            filters["trainingparticipantenrollment__in"] = pk_set
+    else:
+        filters = {"trainingparticipantenrollment": instance}
+
+        if pk_set is not None:
+            filters["trainingweekdays__in"] = pk_set
+
+    _change_counts(sign, **filters)
+
+
+def enrollment_pre_save(sender, instance, raw=False, **kwargs):
+    """
+    Remembers the saved state and training of the enrollment,
+    see :func:`enrollment_saved`.
+    """
+
+    if raw or instance.pk is None:
+        return
+
+    instance._counted_weekdays = Counter(
+        TrainingWeekdayEnrollmentCount.counted_enrollment_weekdays(
+            trainingparticipantenrollment=instance
+        )
+    )
+
+
+def enrollment_saved(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Moves the counted weekdays of the enrollment to its new state or training.
+    """
+
+    if raw or created:
+        return
+
+    previous = getattr(instance, "_counted_weekdays", None)
+
+    if not previous:
+        return
+
+    TrainingWeekdayEnrollmentCount.change(previous, -1)
+    TrainingWeekdayEnrollmentCount.change(
+        Counter(
+            (instance.training_id, weekday, instance.state)
+            for _, weekday, _ in previous.elements()
+        )
+    )
+
+
+def enrollment_deleted(sender, instance, **kwargs):
+    """
+    Subtracts the weekdays of the enrollment from the counters
+    before they are deleted together with the enrollment.
+    """
+
+    _change_counts(-1, trainingparticipantenrollment=instance)
+
+
+def connect_signals():
+    m2m_changed.connect(
+        enrollment_weekdays_changed,
+        sender=_Weekdays,
+        dispatch_uid="enrollment_weekdays_changed",
+    )
+    pre_save.connect(
+        enrollment_pre_save,
+        sender=TrainingParticipantEnrollment,
+        dispatch_uid="enrollment_counts_pre_save",
+    )
+    post_save.connect(
+        enrollment_saved,
+        sender=TrainingParticipantEnrollment,
+        dispatch_uid="enrollment_counts_saved",
+    )
+    pre_delete.connect(
+        enrollment_deleted,
+        sender=TrainingParticipantEnrollment,
+        dispatch_uid="enrollment_counts_deleted",
+    )
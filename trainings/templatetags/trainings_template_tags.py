@@ -49,13 +49,13 @@ def get_weekday(date_or_datetime):
 
 
 @register.filter
-def approved_enrollments_by_weekday(training, weekday):
-    return training.approved_enrollments_by_weekday(weekday)
+def approved_enrollments_count_by_weekday(training, weekday):
+    return training.approved_enrollments_count_by_weekday(weekday)
 
 
 @register.filter
-def substitute_enrollments_by_weekday(training, weekday):
-    return training.substitute_enrollments_by_weekday(weekday)
+def substitute_enrollments_count_by_weekday(training, weekday):
+    return training.substitute_enrollments_count_by_weekday(weekday)
 
 
 @register.filter
@@ -1,5 +1,3 @@
-from datetime import timedelta
-
 from django.contrib import messages
 from django.db.models import Q
 from django.http import Http404
@@ -57,7 +55,6 @@ from vzs.mixins import (
     InsertRequestIntoModelFormKwargsMixin,
     MessagesMixin,
 )
-from vzs.settings import PARTICIPANT_ENROLL_DEADLINE_DAYS
 from vzs.utils import date_pretty, export_queryset_csv, now, send_notification_email
 
 from .forms import (
@@ -294,12 +291,11 @@ class TrainingListView(LoginRequiredMixin, generic.ListView):
         """:meta private:"""
 
         regular_trainings = Training.get_unfinished_trainings_by_coach(active_person)
-        upcoming_occurrences = TrainingOccurrence.get_upcoming_by_coach(
-            active_person, False
-        ).all()
-
-        for occurrence in upcoming_occurrences:
-            occurrence.excused = occurrence.is_coach_excused(active_person)
+        upcoming_occurrences = (
+            TrainingOccurrence.get_upcoming_by_coach(active_person, False)
+            .with_person_status(active_person)
+            .select_related("event")
+        )
 
         kwargs.setdefault("coach_regular_trainings", regular_trainings)
         kwargs.setdefault("coach_upcoming_occurrences", upcoming_occurrences)
@@ -309,32 +305,19 @@ class TrainingListView(LoginRequiredMixin, generic.ListView):
 
         available_trainings = Training.get_available_trainings_by_participant(
             active_person
-        )
+        ).prefetch_related("weekday_enrollment_counts")
         enrolled_trainings = Training.get_unfinished_trainings_by_participant(
             active_person, ParticipantEnrollment.State.APPROVED
         )
         substitute_trainings = Training.get_unfinished_trainings_by_participant(
             active_person, ParticipantEnrollment.State.SUBSTITUTE
-        )
-        for substitute_training in substitute_trainings:
-            substitute_training.enrollment = (
-                substitute_training.get_participant_enrollment(active_person)
-            )
-
-        upcoming_occurrences = TrainingOccurrence.get_upcoming_by_participant(
-            active_person, False
-        ).all()
+        ).with_person_status(active_person)
 
-        for occurrence in upcoming_occurrences:
-            participant_attendance = occurrence.get_participant_attendance(
-                active_person
-            )
-            occurrence.excused = (
-                participant_attendance and participant_attendance.is_excused
-            )
-            occurrence.is_one_time_presence = (
-                participant_attendance.is_one_time_presence
-            )
+        upcoming_occurrences = (
+            TrainingOccurrence.get_upcoming_by_participant(active_person, False)
+            .with_person_status(active_person)
+            .select_related("event")
+        )
 
         kwargs.setdefault("participant_enrolled_trainings", enrolled_trainings)
         kwargs.setdefault("participant_substitute_trainings", substitute_trainings)
@@ -355,26 +338,12 @@ class TrainingListView(LoginRequiredMixin, generic.ListView):
         if count_of_trainings_to_replace <= 0:
             return
 
-        replaceable_trainings = list(enrolled_trainings)
-
-        for enrolled_training in enrolled_trainings:
-            replaceable_trainings += enrolled_training.replaces_training_list()
-
-        date_start = now() + timedelta(days=PARTICIPANT_ENROLL_DEADLINE_DAYS)
-        replaceable_occurrences = (
-            TrainingOccurrence.objects.filter(
-                datetime_start__gte=date_start, event__in=replaceable_trainings
-            )
-            .exclude(participants=active_person)
-            .order_by("datetime_start")
+        available_replaceable_occurrences = (
+            TrainingOccurrence.get_replaceable_by_participant(
+                active_person, enrolled_trainings
+            ).select_related("event")[:10]
         )
 
-        available_replaceable_occurrences = [
-            o
-            for o in replaceable_occurrences
-            if o.can_participant_enroll(active_person)
-        ][:10]
-
         kwargs.setdefault(
             "participant_count_of_trainings_to_replace", count_of_trainings_to_replace
         )
@@ -423,7 +392,9 @@ class TrainingAdminListView(TrainingCreatePermissionMixin, EventAdminListMixin):
             t.pk for t in trainings if t.can_user_manage(active_user)
         ]
 
-        return Training.objects.filter(pk__in=visible_trainings_ids)
+        return Training.objects.filter(pk__in=visible_trainings_ids).prefetch_related(
+            "weekday_enrollment_counts"
+        )
 
 
 class TrainingCreateView(
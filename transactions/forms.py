@@ -1,9 +1,12 @@
 from collections.abc import Iterable, MutableMapping
+from datetime import date
 from typing import Any
 
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import HTML, Column, Div, Layout, Row, Submit
-from django.db.models import QuerySet
+from dateutil.relativedelta import relativedelta
+from django.db.models import QuerySet, prefetch_related_objects
+from django.db.transaction import atomic
 from django.forms import (
     BooleanField,
     CharField,
@@ -24,13 +27,13 @@ from events.models import Event, ParticipantEnrollment
 from persons.forms import PersonsFilterForm
 from persons.models import Person
 from persons.widgets import PersonSelectWidget
-from trainings.models import Training
+from trainings.models import Training, TrainingParticipantEnrollment
 from vzs.datetime_constants import MONTH_NAMES
 from vzs.forms import WithoutFormTagFormHelper, WithoutFormTagMixin
 from vzs.utils import (
     filter_queryset,
     payment_email_html,
-    send_notification_email,
+    send_notification_emails,
     today,
 )
 from vzs.widgets import DatePickerWithIcon
@@ -381,51 +384,88 @@ class TransactionCreateBulkConfirmForm(
 
     def save(self, commit: bool = True):
         """
-        Sends an email to each person a transaction was created for.
+        Creates all the transactions and their enrollment relations in bulk.
+
+        The payment emails for the persons the transactions were created for
+        are handed over to the outbox, their delivery can be tracked
+        on the bulk transaction detail page.
         """
 
         bulk_transaction = super().save(False)
 
-        if commit:
+        if not commit:
+            return bulk_transaction
+
+        with atomic():
             bulk_transaction.save()
 
-        for transaction, enrollment in self.transactions_and_enrollments:
-            transaction.bulk_transaction = bulk_transaction
+            for transaction, enrollment in self.transactions_and_enrollments:
+                transaction.bulk_transaction = bulk_transaction
 
-            if commit:
-                transaction.save()
+            Transaction.objects.bulk_create(
+                transaction
+                for transaction, enrollment in self.transactions_and_enrollments
+            )
 
-            if enrollment:
-                enrollment.transactions.add(transaction)
-                self._send_new_transaction_with_enrollment_email(
-                    enrollment, transaction
-                )
-            else:
-                self._send_new_transaction_with_reason_email(self.reason, transaction)
+            self._add_enrollment_transactions()
+            self._send_new_transaction_emails(bulk_transaction)
 
         return bulk_transaction
 
-    def _send_new_transaction_with_enrollment_email(
-        self, enrollment: ParticipantEnrollment, transaction: Transaction
-    ):
-        payment_html = "<br><br>" + payment_email_html(transaction, self.request)
-        send_notification_email(
-            _("Nová transakce k zaplacení"),
-            _("U události {0} byla vytvořena" "nová transakce k zaplacení.").format(
-                enrollment.event
+    def _add_enrollment_transactions(self):
+        enrollment_transactions = [
+            (enrollment, transaction)
+            for transaction, enrollment in self.transactions_and_enrollments
+            if enrollment
+        ]
+
+        if not enrollment_transactions:
+            return
+
+        through = TrainingParticipantEnrollment.transactions.through
+
+        through.objects.bulk_create(
+            through(
+                trainingparticipantenrollment_id=enrollment.pk,
+                transaction_id=transaction.pk,
             )
-            + payment_html,
-            [enrollment.person],
+            for enrollment, transaction in enrollment_transactions
         )
 
-    def _send_new_transaction_with_reason_email(
-        self, reason: str, transaction: Transaction
+    def _send_new_transaction_emails(self, bulk_transaction: BulkTransaction):
+        prefetch_related_objects(
+            [
+                transaction.person
+                for transaction, enrollment in self.transactions_and_enrollments
+            ],
+            "managed_by",
+        )
+
+        send_notification_emails(
+            (
+                self._new_transaction_email(transaction, enrollment)
+                for transaction, enrollment in self.transactions_and_enrollments
+            ),
+            bulk_transaction.email_batch,
+        )
+
+    def _new_transaction_email(
+        self, transaction: Transaction, enrollment: ParticipantEnrollment | None
     ):
         payment_html = "<br><br>" + payment_email_html(transaction, self.request)
-        send_notification_email(
+
+        if enrollment:
+            message = _(
+                "U události {0} byla vytvořena" "nová transakce k zaplacení."
+            ).format(enrollment.event)
+        else:
+            message = _("Byla pro vás vytvořena nová transakce s popisem {0}").format(
+                self.reason
+            )
+
+        return (
             _("Nová transakce k zaplacení"),
-            _("Byla pro vás vytvořena nová transakce s popisem {0}").format(reason)
-            + payment_html,
+            message + payment_html,
             [transaction.person],
         )
 
@@ -633,6 +673,13 @@ class TransactionAccountingExportPeriodForm(Form):
         choices=[("", "---------")]
         + [(i, month) for i, month in enumerate(MONTH_NAMES, start=1)],
     )
+    month_to = ChoiceField(
+        label=_("Do měsíce"),
+        required=False,
+        choices=[("", "---------")]
+        + [(i, month) for i, month in enumerate(MONTH_NAMES, start=1)],
+        help_text=_("Vyplňte pro export více měsíců daného roku."),
+    )
     type = ChoiceField(
         label=_("Typ exportu"),
         required=True,
@@ -652,3 +699,35 @@ class TransactionAccountingExportPeriodForm(Form):
         else:
             self.initial["year"] = today().year - 1
             self.initial["month"] = 12
+
+    def clean(self):
+        """
+        Validates that the period ends after it begins.
+        """
+
+        cleaned_data = super().clean()
+
+        month = cleaned_data.get("month")
+        month_to = cleaned_data.get("month_to")
+
+        if not month or not month_to:
+            return cleaned_data
+
+        if int(month_to) < int(month):
+            self.add_error("month_to", _("Konec období nemůže být před jeho začátkem."))
+
+        return cleaned_data
+
+    def get_period(self):
+        """
+        Returns the first and the last day of the selected period.
+        """
+
+        year = self.cleaned_data["year"]
+        month = int(self.cleaned_data["month"])
+        month_to = int(self.cleaned_data["month_to"] or month)
+
+        date_from = date(year, month, 1)
+        date_to = date(year, month_to, 1) + relativedelta(months=1, days=-1)
+
+        return date_from, date_to
@@ -1,38 +1,68 @@
 from datetime import timedelta
+from time import perf_counter
 
 from django.core.management.base import BaseCommand
 from django.utils.translation import gettext_lazy as _
 from fiobank import ThrottlingError
 
 from transactions.models import FioSettings
-from transactions.utils import fetch_fio
+from transactions.utils import fetch_fio, sync_fio
+from vzs.commands_utils import positive_int
 from vzs.settings import CURRENT_DATETIME
+from vzs.utils import today
 
 
 class Command(BaseCommand):
     help = (
         "Fetches transactions from the organisation's bank account into the DB."
         "Can optionally specify <days> for the length of the period."
-        "Otherwise fetches since the last success."
+        "Otherwise fetches the transactions newer than the last processed one."
     )
 
     def add_arguments(self, parser):
         parser.add_argument("--days", type=int)
+        parser.add_argument(
+            "--chunk-size",
+            type=positive_int,
+            default=500,
+            help="Number of transactions processed in one DB transaction.",
+        )
 
-    def handle(self, *args, **options):
-        settings = FioSettings.load()
+    def _fetch_period(self, days):
         now = CURRENT_DATETIME()
 
-        days_argument = options["days"]
+        settled_count = fetch_fio(now - timedelta(days=days), now)
+
+        self.stdout.write(f"Settled {settled_count} transactions.")
 
-        begin_time = (
-            now - timedelta(days=days_argument)
-            if days_argument
-            else settings.last_fio_fetch_time
+    def _sync(self, chunk_size):
+        start = perf_counter()
+        result = sync_fio(chunk_size)
+        elapsed = perf_counter() - start
+
+        throughput = result.fetched_count / elapsed if elapsed else 0
+
+        self.stdout.write(
+            f"Fetched {result.fetched_count} transactions in {elapsed:.3f} s "
+            f"({throughput:.1f} transactions/s), "
+            f"settled {result.settled_count} transactions."
         )
 
+        if result.last_date is not None:
+            lag = (today() - result.last_date).days
+            self.stdout.write(
+                f"Last processed Fio transaction {FioSettings.load().last_fio_id} "
+                f"from {result.last_date} ({lag} days ago)."
+            )
+
+    def handle(self, *args, **options):
+        days_argument = options["days"]
+
         try:
-            fetch_fio(begin_time, now)
+            if days_argument:
+                self._fetch_period(days_argument)
+            else:
+                self._sync(options["chunk_size"])
         except ThrottlingError:
             self.stdout.write(
                 self.style.ERROR(
@@ -40,8 +70,4 @@ class Command(BaseCommand):
                 )
             )
         else:
-            if not days_argument:
-                settings.last_fio_fetch_time = CURRENT_DATETIME()
-                settings.save()
-
             self.stdout.write(self.style.SUCCESS(_(f"Úspěšně stáhnuté transakce.")))
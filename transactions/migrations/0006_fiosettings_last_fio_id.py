@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transactions", "0005_alter_bulktransaction_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fiosettings",
+            name="last_fio_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.db.models import (
     CASCADE,
     SET_NULL,
     CharField,
+    Count,
     DateField,
     DateTimeField,
     ForeignKey,
@@ -48,6 +49,37 @@ class BulkTransaction(Model):
     The event to which the sub-transactions are related, if any.
     """
 
+    @property
+    def email_batch(self):
+        """
+        The batch tag of the payment emails sent to the persons
+        the sub-transactions were created for.
+        """
+
+        return f"bulk-transaction-{self.pk}"
+
+    def email_progress(self):
+        """
+        Returns the number of payment emails in each delivery state
+        (``queued``, ``sent`` and ``failed``) and their ``total`` count.
+        """
+
+        from emails.models import QueuedEmail
+
+        counts = dict(
+            QueuedEmail.objects.filter(batch=self.email_batch)
+            .order_by()
+            .values_list("state")
+            .annotate(count=Count("pk"))
+        )
+        progress = {
+            state.name.lower(): counts.get(state.value, 0)
+            for state in QueuedEmail.State
+        }
+        progress["total"] = sum(progress.values())
+
+        return progress
+
     def __str__(self):
         return self.reason
 
@@ -115,6 +147,11 @@ class Transaction(ExportableCSVMixin, Model):
     and therefore settled.
     """
 
+    updated_at = DateTimeField(auto_now=True, null=True, db_index=True)
+    """
+    Time of the last change of the transaction.
+    """
+
     Q_debt = Q(amount__lt=0)
     Q_reward = Q(amount__gt=0)
 
@@ -128,6 +165,7 @@ class Transaction(ExportableCSVMixin, Model):
         "date_due",
     ]
     csv_labels = {"type": "Druh transakce"}
+    csv_select_related = ["feature_assigment__feature"]
     csv_getters = {
         "amount": lambda instance: abs(instance.amount),
         "type": lambda instance: instance.reward_string,
@@ -182,3 +220,9 @@ class FioSettings(DatabaseSettingsMixin):
     The last time Fio transactions were fetched.
     Used as a possible beginning of the period from which to fetch Fio transactions.
     """
+
+    last_fio_id = PositiveIntegerField(null=True)
+    """
+    ID of the last processed Fio transaction.
+    Used as the beginning of the incremental synchronization with the Fio API.
+    """
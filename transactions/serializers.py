@@ -4,8 +4,9 @@ from rest_framework.serializers import (
 )
 
 from events.models import Event
+from features.models import FeatureAssignment
 
-from .models import Transaction
+from .models import BulkTransaction, FioTransaction, Transaction
 
 
 class TransactionSerializer(HyperlinkedModelSerializer):
@@ -18,3 +19,15 @@ class TransactionSerializer(HyperlinkedModelSerializer):
         }
 
     event = PrimaryKeyRelatedField(queryset=Event.objects.all())
+
+    feature_assigment = PrimaryKeyRelatedField(
+        queryset=FeatureAssignment.objects.all(), required=False, allow_null=True
+    )
+
+    bulk_transaction = PrimaryKeyRelatedField(
+        queryset=BulkTransaction.objects.all(), required=False, allow_null=True
+    )
+
+    fio_transaction = PrimaryKeyRelatedField(
+        queryset=FioTransaction.objects.all(), required=False, allow_null=True
+    )
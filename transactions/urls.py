@@ -2,6 +2,7 @@ from django.urls import path
 
 from .views import (
     BulkTransactionDeleteView,
+    BulkTransactionDetailView,
     TransactionCreateBulkView,
     TransactionCreateSameAmountBulkConfirmView,
     TransactionCreateView,
@@ -68,6 +69,11 @@ urlpatterns = [
         TransactionDeleteView.as_view(),
         name="delete",
     ),
+    path(
+        "hromadne/<int:pk>/",
+        BulkTransactionDetailView.as_view(),
+        name="detail-bulk",
+    ),
     path(
         "<int:pk>/smazat-hromadnou/",
         BulkTransactionDeleteView.as_view(),
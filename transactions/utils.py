@@ -1,82 +1,119 @@
 from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import date, datetime
+from itertools import groupby
+from operator import itemgetter
 from typing import Annotated, TypedDict
 from zoneinfo import ZoneInfo
 
 
-from django.db.models import Q, Sum
-from django.template.loader import render_to_string
+from dateutil.relativedelta import relativedelta
+from django.db.transaction import atomic
+from django.db.models import Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.html import format_html_join
 from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
 from fiobank import FioBank
 
 from events.models import ParticipantEnrollment
-from persons.models import Person
+from persons.models import Person, PersonHourlyRate
 from users.utils import get_permission_by_codename
 from vzs.settings import FIO_TOKEN, ICO
 from vzs.utils import (
     email_notification_recipient_set,
-    get_csv_writer_http_response,
-    get_xml_http_response,
+    get_csv_streaming_http_response,
+    get_xml_streaming_http_response,
     now,
     send_mail,
 )
-from .models import FioTransaction, Transaction, BulkTransaction
+from .models import FioSettings, FioTransaction, Transaction, BulkTransaction
 
 _fio_client = FioBank(FIO_TOKEN)
 
 
-def _send_mail_to_accountants(subject: str, body: str):
+def _send_mail_to_accountants(subject: str, body: str, **kwargs):
     accountant_emails = (
         get_permission_by_codename("transakce")
         .user_set.select_related("person__email")
         .values_list("person__email", flat=True)
     )
 
-    send_mail(subject=subject, message=body, recipient_list=accountant_emails)
+    send_mail(subject=subject, message=body, recipient_list=accountant_emails, **kwargs)
 
 
 def _date_prague(date_time: datetime):
     return localdate(date_time, timezone=ZoneInfo("Europe/Prague"))
 
 
-def fetch_fio(date_time_start: datetime, date_time_end: datetime):
+@dataclass
+class ReceivedFioTransaction:
+    """
+    An incoming transaction fetched from the Fio API
+    that is a candidate for matching with a transaction in the DB.
     """
-    Fetches transactions from the organisation's bank account into the DB.
 
-    This means matching the fetched Fio transactions with the transactions in the DB.
-    The matching is done by the variable symbol.
+    transaction_pk: int
+    amount: int
+    date_settled: date
+    fio_id: int
 
-    Sends an email to the accountants if there is a problem with the matching:
 
-    *   fetched transaction has the same VS as another previosly matched transaction
-    *   fetched transaction has a different amount
-        than the matched transaction from the DB
+def _parse_received_transaction(received_transaction: dict):
+    """
+    Returns the :class:`ReceivedFioTransaction` for the ``received_transaction``
+    from the ``fiobank`` package or ``None`` if it should be ignored.
     """
 
-    date_start = _date_prague(date_time_start)
-    date_end = _date_prague(date_time_end)
+    received_variabilni = received_transaction["variable_symbol"]
+    received_amount = int(received_transaction["amount"])
 
-    for received_transaction in _fio_client.period(date_start, date_end):
-        received_variabilni = received_transaction["variable_symbol"]
-        received_amount = int(received_transaction["amount"])
-        received_date = received_transaction["date"]
-        received_id = int(received_transaction["transaction_id"])
+    if received_amount <= 0:
+        # we ignore outgoing transactions
+        return None
 
-        if received_amount <= 0:
-            # we ignore outgoing transactions
-            continue
+    if received_variabilni is None or received_variabilni[0] == "0":
+        return None
 
-        if received_variabilni is None or received_variabilni[0] == "0":
-            continue
+    try:
+        transaction_pk = int(received_variabilni)
+    except ValueError:
+        return None
 
-        try:
-            transaction_pk = int(received_variabilni)
-        except ValueError:
-            continue
+    return ReceivedFioTransaction(
+        transaction_pk=transaction_pk,
+        amount=received_amount,
+        date_settled=received_transaction["date"],
+        fio_id=int(received_transaction["transaction_id"]),
+    )
 
-        transaction = Transaction.objects.filter(pk=transaction_pk).first()
+
+def _match_fio_transactions(received_transactions: list[ReceivedFioTransaction]):
+    """
+    Matches the ``received_transactions`` with the transactions in the DB.
+
+    The matching transactions are loaded in one query, the new
+    :class:`transactions.models.FioTransaction` instances are created
+    and the settled transactions are updated in bulk in a single DB transaction.
+
+    Returns the number of newly settled transactions
+    and the list of descriptions of the problems with the matching.
+    """
+
+    transactions = Transaction.objects.select_related(
+        "person", "fio_transaction"
+    ).in_bulk({received.transaction_pk for received in received_transactions})
+    known_fio_ids = FioTransaction.objects.in_bulk(
+        {received.fio_id for received in received_transactions}, field_name="fio_id"
+    )
+
+    settled_transactions = []
+    problems = []
+
+    for received in received_transactions:
+        transaction = transactions.get(received.transaction_pk)
 
         if transaction is None:
             # received a transaction with a VS that doesn't have a matching transaction in the DB: ignore
@@ -84,45 +121,215 @@ def fetch_fio(date_time_start: datetime, date_time_end: datetime):
 
         if transaction.fio_transaction is not None:
             fio_id = transaction.fio_transaction.fio_id
-            if fio_id != received_id:
+            if fio_id != received.fio_id:
                 # the account has multiple transactions with the same VS
-                _send_mail_to_accountants(
-                    _("Transakce se stejným VS."),
+                problems.append(
                     _(
                         "Přijatá transakce s Fio ID {0} má stejný VS jako"
-                        " transakce s Fio ID {1}.\n"
-                        "Transakce s Fio ID {1} je v systému registrovaná jako"
-                        " transakce {2} osoby {3}.\n"
+                        " transakce s Fio ID {1}."
+                        " Transakce s Fio ID {1} je v systému registrovaná jako"
+                        " transakce {2} osoby {3}."
                     ).format(
-                        received_id, fio_id, transaction.pk, str(transaction.person)
-                    ),
+                        received.fio_id,
+                        fio_id,
+                        transaction.pk,
+                        str(transaction.person),
+                    )
                 )
 
             # IDs match, so we just fetched the same transaction sometime in the past: ignore
             continue
 
-        if -transaction.amount != received_amount:
-            _send_mail_to_accountants(
-                "Suma transakce na účtu se liší od zadané transakce v systému.",
+        if -transaction.amount != received.amount:
+            problems.append(
                 _(
                     "Transakce číslo {0} osoby {1} se liší v sumě"
-                    "od zadané transakce v systému.\n"
-                    "Zadaná suma je {2} Kč"
-                    "a reálná suma je {3} Kč"
+                    " od zadané transakce v systému."
+                    " Zadaná suma je {2} Kč"
+                    " a reálná suma je {3} Kč."
                 ).format(
                     transaction.pk,
                     str(transaction.person),
                     abs(transaction.amount),
-                    abs(received_amount),
-                ),
+                    abs(received.amount),
+                )
             )
             continue
 
-        fio_transaction = FioTransaction.objects.create(
-            date_settled=received_date, fio_id=received_id
+        if received.fio_id in known_fio_ids:
+            # the Fio transaction already settled a transaction that no longer exists
+            continue
+
+        transaction.fio_transaction = FioTransaction(
+            date_settled=received.date_settled, fio_id=received.fio_id
+        )
+        settled_transactions.append(transaction)
+
+    for transaction in settled_transactions:
+        # ``bulk_update`` skips ``auto_now``
+        transaction.updated_at = timezone.now()
+
+    with atomic():
+        FioTransaction.objects.bulk_create(
+            [transaction.fio_transaction for transaction in settled_transactions]
+        )
+        Transaction.objects.bulk_update(
+            settled_transactions, ["fio_transaction", "updated_at"]
+        )
+
+    return len(settled_transactions), problems
+
+
+def _send_problems_to_accountants(problems: list[str]):
+    if problems:
+        _send_mail_to_accountants(
+            _("Problémy při párování transakcí z Fio."),
+            "",
+            html_message=format_html_join(
+                "", "<p>{}</p>", ((problem,) for problem in problems)
+            ),
         )
-        transaction.fio_transaction = fio_transaction
-        transaction.save()
+
+
+def reconcile_fio_transactions(received_transactions: list[ReceivedFioTransaction]):
+    """
+    Matches the ``received_transactions`` with the transactions in the DB.
+
+    All problems with the matching are sent to the accountants in a single email:
+
+    *   received transaction has the same VS as another previously matched transaction
+    *   received transaction has a different amount
+        than the matched transaction from the DB
+
+    Returns the number of newly settled transactions.
+    """
+
+    settled_count, problems = _match_fio_transactions(received_transactions)
+
+    _send_problems_to_accountants(problems)
+
+    return settled_count
+
+
+def fetch_fio(date_time_start: datetime, date_time_end: datetime):
+    """
+    Fetches transactions from the organisation's bank account into the DB.
+
+    This means matching the fetched Fio transactions with the transactions in the DB.
+    The matching is done by the variable symbol,
+    see :func:`reconcile_fio_transactions`.
+
+    Returns the number of newly settled transactions.
+    """
+
+    date_start = _date_prague(date_time_start)
+    date_end = _date_prague(date_time_end)
+
+    received_transactions = []
+
+    for received_transaction in _fio_client.period(date_start, date_end):
+        received = _parse_received_transaction(received_transaction)
+
+        if received is not None:
+            received_transactions.append(received)
+
+    return reconcile_fio_transactions(received_transactions)
+
+
+@dataclass
+class FioSyncResult:
+    """
+    Statistics of one run of :func:`sync_fio`.
+    """
+
+    fetched_count: int = 0
+    """
+    The number of fetched Fio transactions, including the ignored ones.
+    """
+
+    settled_count: int = 0
+    """
+    The number of newly settled transactions.
+    """
+
+    last_date: date | None = None
+    """
+    The date of the newest processed Fio transaction.
+    """
+
+
+def _chunks(iterable: Iterable, chunk_size: int):
+    chunk = []
+
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def sync_fio(chunk_size: int = 500):
+    """
+    Fetches the transactions from the organisation's bank account
+    that are newer than the last processed one into the DB.
+
+    The ID of the last processed Fio transaction is stored
+    in :attr:`transactions.models.FioSettings.last_fio_id` together with
+    each processed chunk of ``chunk_size`` transactions in one DB transaction.
+    An interrupted synchronization therefore resumes from the last processed chunk.
+    Without a stored ID, the transactions since
+    :attr:`transactions.models.FioSettings.last_fio_fetch_time` are fetched.
+
+    The matching is done by :func:`reconcile_fio_transactions`,
+    all problems are sent to the accountants in a single email.
+
+    Returns :class:`FioSyncResult`.
+    """
+
+    settings = FioSettings.load()
+
+    if settings.last_fio_id is None:
+        received_transactions = _fio_client.last(
+            from_date=_date_prague(settings.last_fio_fetch_time)
+        )
+    else:
+        received_transactions = _fio_client.last(from_id=settings.last_fio_id)
+
+    result = FioSyncResult()
+    problems = []
+
+    try:
+        for chunk in _chunks(received_transactions, chunk_size):
+            received = [
+                parsed
+                for parsed in map(_parse_received_transaction, chunk)
+                if parsed is not None
+            ]
+
+            with atomic():
+                settled_count, chunk_problems = _match_fio_transactions(received)
+
+                settings.last_fio_id = max(
+                    settings.last_fio_id or 0,
+                    *(int(transaction["transaction_id"]) for transaction in chunk),
+                )
+                settings.save()
+
+            result.fetched_count += len(chunk)
+            result.settled_count += settled_count
+            result.last_date = chunk[-1]["date"]
+            problems.extend(chunk_problems)
+    finally:
+        _send_problems_to_accountants(problems)
+
+    settings.last_fio_fetch_time = now()
+    settings.save()
+
+    return result
 
 
 class TransactionFilter(TypedDict, total=False):
@@ -211,60 +418,125 @@ class TransactionInfo:
         return f"transactions-{self.person.pk}-date_due"
 
 
-def export_rewards_to_csv(year, month):
-    writer, http_response = get_csv_writer_http_response(f"vyplaty-{year}-{month}")
+def _period_name(date_from: date, date_to: date):
+    if date_from.day == 1 and date_to == date_from + relativedelta(months=1, days=-1):
+        return f"{date_from.year}-{date_from.month}"
 
-    persons_summaries = (
-        Person.objects.filter(
-            transactions__date_due__year=year,
-            transactions__date_due__month=month,
-            transactions__amount__gt=0,
-        )
-        .distinct()
-        .annotate(amount_sum=Sum("transactions__amount"))
-        .order_by("last_name", "first_name")
-    )
+    if (date_from.month, date_from.day, date_to.month, date_to.day) == (1, 1, 12, 31):
+        if date_from.year == date_to.year:
+            return f"{date_from.year}"
 
-    for person in persons_summaries:
-        divided_rewards = {}
+    return f"{date_from.isoformat()}-{date_to.isoformat()}"
 
-        hourly_rates = {h.event_type: h.hourly_rate for h in person.hourly_rates.all()}
-        person_rewards = person.transactions.filter(
-            date_due__year=year,
-            date_due__month=month,
-            amount__gt=0,
-            event__isnull=False,
-        )
 
-        for reward in person_rewards:
-            category = (
-                reward.event.category
-                if reward.event.category in hourly_rates
-                else "nezarazeno"
-            )
-            divided_rewards.setdefault(category, 0)
-            divided_rewards[category] += reward.amount
+def export_rewards_to_csv(date_from: date, date_to: date):
+    """
+    Exports the rewards due from ``date_from`` to ``date_to`` (inclusive)
+    as a streaming CSV file.
 
-        writer.writerow(
-            [person.last_name, person.first_name, "", "", person.amount_sum]
+    Every rewarded person has a row with the sum of all their rewards
+    followed by rows with the sums of their rewards per event category
+    together with their hourly rate for the category. Rewards for categories
+    without an hourly rate of the person are summed as ``nezarazeno``.
+
+    The sums are computed by a single query grouped by the person
+    and the event category.
+    """
+
+    hourly_rate = PersonHourlyRate.objects.filter(
+        person=OuterRef("person"), event_type=OuterRef("category")
+    ).values("hourly_rate")
+
+    rewards = (
+        Transaction.objects.filter(
+            Transaction.Q_reward,
+            date_due__range=(date_from, date_to),
+            person__is_deleted=False,
         )
+        .annotate(
+            category=Coalesce(
+                "event__onetimeevent__category", "event__training__category"
+            ),
+            hourly_rate=Subquery(hourly_rate),
+        )
+        .values(
+            "person",
+            "person__last_name",
+            "person__first_name",
+            "category",
+            "hourly_rate",
+        )
+        .annotate(amount_sum=Sum("amount"), last_pk=Max("pk"))
+        .order_by("person__last_name", "person__first_name", "person", "-last_pk")
+    )
 
-        for category, amount in divided_rewards.items():
-            writer.writerow(["", "", category, hourly_rates.get(category, ""), amount])
+    def rows():
+        for _, person_rewards in groupby(rewards.iterator(), itemgetter("person")):
+            person_rewards = list(person_rewards)
+
+            divided_rewards = {}
+            hourly_rates = {}
+
+            for reward in person_rewards:
+                if reward["category"] is None:
+                    # the reward is not related to an event
+                    continue
+
+                if reward["hourly_rate"] is None:
+                    category = "nezarazeno"
+                    hourly_rates[category] = ""
+                else:
+                    category = reward["category"]
+                    hourly_rates[category] = reward["hourly_rate"]
+
+                divided_rewards.setdefault(category, 0)
+                divided_rewards[category] += reward["amount_sum"]
+
+            yield [
+                person_rewards[0]["person__last_name"],
+                person_rewards[0]["person__first_name"],
+                "",
+                "",
+                sum(reward["amount_sum"] for reward in person_rewards),
+            ]
+
+            for category, amount in divided_rewards.items():
+                yield ["", "", category, hourly_rates[category], amount]
+
+    return get_csv_streaming_http_response(
+        f"vyplaty-{_period_name(date_from, date_to)}", rows()
+    )
 
-    return http_response
 
+def export_debts_to_xml(date_from: date, date_to: date):
+    """
+    Exports the debts due from ``date_from`` to ``date_to`` (inclusive)
+    as a streaming XML file of invoices, which can be imported to the Pohoda software.
 
-def export_debts_to_xml(year, month):
-    http_response = get_xml_http_response(f"faktury-{year}-{month}")
+    The invoices are rendered one by one while iterating the debts
+    with their persons loaded in chunks.
+    """
 
     transactions = Transaction.objects.filter(
-        date_due__year=year, date_due__month=month, amount__lt=0
-    )
+        Transaction.Q_debt, date_due__range=(date_from, date_to)
+    ).select_related("person")
 
-    data = {"transactions": transactions, "ico": ICO, "id": now().timestamp()}
+    data = {"ico": ICO, "id": now().timestamp()}
+    invoice_template = get_template("transactions_xml/invoice.xml")
 
-    text_content = render_to_string("transactions_xml/invoices.xml", context=data)
-    http_response.write(text_content.encode("utf8"))
+    def content():
+        # the indentation matches the original single template of the data pack
+        yield render_to_string("transactions_xml/invoices_header.xml", data)
+        yield "    "
 
-    return http_response
+        for transaction in transactions.iterator(chunk_size=2000):
+            yield "\n        "
+            yield invoice_template.render({"transaction": transaction})
+            yield "\n    "
+
+        yield "\n"
+        yield render_to_string("transactions_xml/invoices_footer.xml", data)
+
+    return get_xml_streaming_http_response(
+        f"faktury-{_period_name(date_from, date_to)}", content()
+    )
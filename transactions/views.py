@@ -4,7 +4,7 @@ from typing import Any
 
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import SuspiciousOperation
-from django.db.models import Q, Sum
+from django.db.models import Count, Q, Sum
 from django.db.models.query import QuerySet
 from django.forms import Form
 from django.http import HttpRequest
@@ -411,6 +411,46 @@ class BulkTransactionIndexView(TransactionEditPermissionMixin, ListView):
     """:meta private:"""
 
 
+class BulkTransactionDetailView(TransactionEditPermissionMixin, DetailView):
+    """
+    Displays the transactions of a bulk transaction
+    and the delivery progress of their payment emails.
+
+    **Permissions**:
+
+    Users with the ``transakce`` permission.
+
+    **Path parameters:**
+
+    *   ``pk`` - ID of the bulk transaction
+    """
+
+    context_object_name = "bulk_transaction"
+    """:meta private:"""
+
+    model = BulkTransaction
+    """:meta private:"""
+
+    template_name = "transactions/detail_bulk.html"
+    """:meta private:"""
+
+    def get_context_data(self, **kwargs):
+        """
+        *   ``transactions`` - the sub-transactions of the bulk transaction
+        *   ``email_progress`` - the number of payment emails in each delivery state
+        """
+
+        kwargs.setdefault(
+            "transactions",
+            self.object.transaction_set.select_related(
+                "person", "fio_transaction"
+            ).order_by("person__last_name", "person__first_name"),
+        )
+        kwargs.setdefault("email_progress", self.object.email_progress())
+
+        return super().get_context_data(**kwargs)
+
+
 class TransactionIndexView(TransactionEditPermissionMixin, ListView):
     """
     Displays a list of all transactions
@@ -694,7 +734,7 @@ class TransactionCreateSameAmountBulkConfirmView(TransactionCreateBulkConfirmMix
     """
     Creates a bulk transaction with the same amount for all persons.
 
-    **Success redirection view**: :class:`TransactionIndexView`
+    **Success redirection view**: :class:`BulkTransactionDetailView`
 
     **Permissions**:
 
@@ -711,12 +751,14 @@ class TransactionCreateSameAmountBulkConfirmView(TransactionCreateBulkConfirmMix
     success_message = _("Hromadná transakce byla přidána")
     """:meta private:"""
 
-    success_url = reverse_lazy("transactions:index")
-    """:meta private:"""
-
     template_name = "transactions/create_bulk_confirm.html"
     """:meta private:"""
 
+    def get_success_url(self):
+        """:meta private:"""
+
+        return reverse("transactions:detail-bulk", args=(self.object.pk,))
+
     def create_transaction_infos(
         self, query_parameters: Mapping[str, Any]
     ) -> Iterable[TransactionInfo]:
@@ -804,12 +846,17 @@ class TransactionCreateTrainingBulkConfirmView(
         Generates transaction infos for all persons enrolled in the training.
         """
 
-        approved_enrollments = self.event.approved_enrollments()
+        approved_enrollments = (
+            self.event.approved_enrollments()
+            .select_related("person", "training")
+            .annotate(weekdays_count=Count("weekdays"))
+            .order_by("pk")
+        )
 
         for enrollment in approved_enrollments:
             person = enrollment.person
 
-            repetition_per_week = enrollment.weekdays.count()
+            repetition_per_week = enrollment.weekdays_count
             amount = -int(query_parameters[f"amount_{repetition_per_week - 1}"])
 
             yield TransactionInfo(
@@ -940,12 +987,8 @@ class TransactionAccountingExportView(TransactionEditPermissionMixin, FormView):
         export_type = form.cleaned_data["type"]
 
         if export_type == "pohledavky":
-            return export_debts_to_xml(
-                form.cleaned_data["year"], form.cleaned_data["month"]
-            )
+            return export_debts_to_xml(*form.get_period())
         elif export_type == "vyplaty":
-            return export_rewards_to_csv(
-                form.cleaned_data["year"], form.cleaned_data["month"]
-            )
+            return export_rewards_to_csv(*form.get_period())
         else:
             raise SuspiciousOperation("Missing parameters")
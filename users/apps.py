@@ -103,12 +103,17 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         """
-        Hooks our custom permission generation to the ``post_migrate`` signal.
+        Hooks our custom permission generation to the ``post_migrate`` signal
+        and the invalidation of cached active persons to model signals.
         """
 
+        from .signals import connect_signals
+
         post_migrate.disconnect(
             dispatch_uid="django.contrib.auth.management.create_permissions"
         )
         post_migrate.connect(
             _custom_create_permissions, dispatch_uid="_custom_create_permissions"
         )
+
+        connect_signals()
@@ -1,10 +1,13 @@
-from persons.models import Person
+from .utils import get_active_person
 
 
 class ActivePersonMiddleware:
     """
     Injects the active person from the session into the request object.
 
+    The person is loaded with :func:`users.utils.get_active_person`,
+    so it may come from the cache if ``ACTIVE_PERSON_CACHE`` is enabled.
+
     Request member variable name: ``active_person``.
     """
 
@@ -15,7 +18,7 @@ class ActivePersonMiddleware:
         active_person_pk = request.session.get("_active_person_pk", None)
 
         request.active_person = (
-            Person.objects.get(pk=active_person_pk)
+            get_active_person(active_person_pk)
             if active_person_pk is not None
             else None
         )
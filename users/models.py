@@ -82,6 +82,11 @@ class User(RenderableModelMixin, AbstractUser, PermissionsMixin):
         "persons.Person", on_delete=models.CASCADE, primary_key=True
     )
 
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
+    """
+    Time of the last change of the user or of their permissions.
+    """
+
     username = None
     """:meta private:"""
     first_name = None
@@ -1,6 +1,8 @@
+from django.contrib.auth.models import Group, Permission
 from rest_framework.serializers import (
     HyperlinkedModelSerializer,
     HyperlinkedRelatedField,
+    PrimaryKeyRelatedField,
 )
 
 from persons.models import Person
@@ -23,3 +25,11 @@ class UserSerializer(HyperlinkedModelSerializer):
     person = HyperlinkedRelatedField(
         queryset=Person.objects.all(), view_name="api:person-detail"
     )
+
+    groups = PrimaryKeyRelatedField(
+        queryset=Group.objects.all(), many=True, required=False
+    )
+
+    user_permissions = PrimaryKeyRelatedField(
+        queryset=Permission.objects.all(), many=True, required=False
+    )
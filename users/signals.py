@@ -0,0 +1,66 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from persons.models import Person
+
+from .models import Permission, User
+from .utils import invalidate_active_person, invalidate_active_persons
+
+
+def person_or_user_changed(sender, instance, **kwargs):
+    """
+    Invalidates the cached active person when the person or their user changes.
+
+    The primary key of a user is the primary key of its person.
+    """
+
+    invalidate_active_person(instance.pk)
+
+
+def permission_changed(sender, **kwargs):
+    """
+    Invalidates all cached active persons when a permission changes.
+    """
+
+    invalidate_active_persons()
+
+
+def user_permissions_changed(sender, instance, action, reverse, **kwargs):
+    """
+    Invalidates the cached active persons whose permissions changed.
+    """
+
+    if not action.startswith("post_"):
+        return
+
+    if reverse:
+        invalidate_active_persons()
+    else:
+        invalidate_active_person(instance.pk)
+
+
+def connect_signals():
+    for model in [Person, User]:
+        post_save.connect(
+            person_or_user_changed,
+            sender=model,
+            dispatch_uid=f"active_person_{model.__name__}_saved",
+        )
+        post_delete.connect(
+            person_or_user_changed,
+            sender=model,
+            dispatch_uid=f"active_person_{model.__name__}_deleted",
+        )
+
+    post_save.connect(
+        permission_changed, sender=Permission, dispatch_uid="permission_saved"
+    )
+    post_delete.connect(
+        permission_changed, sender=Permission, dispatch_uid="permission_deleted"
+    )
+
+    for through in [User.user_permissions.through, User.groups.through]:
+        m2m_changed.connect(
+            user_permissions_changed,
+            sender=through,
+            dispatch_uid=f"active_person_{through.__name__}_changed",
+        )
@@ -2,8 +2,12 @@ import secrets
 from string import ascii_lowercase, ascii_uppercase, digits
 
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.utils.crypto import get_random_string
 
+from persons.models import Person, get_active_user
+from vzs import settings
+
 
 def create_random_password():
     """
@@ -33,3 +37,89 @@ def get_permission_by_codename(codename: str):
     content_type = ContentType.objects.get_for_model(Permission)
 
     return Permission.objects.get(codename=codename, content_type=content_type)
+
+
+def get_permission_holders(codenames):
+    """
+    Returns a mapping of permission codenames to lists of persons
+    whose users have the permission assigned.
+
+    Loads all the permissions with ``codenames`` and their holders at once,
+    unlike calling :func:`get_permission_by_codename` for each of them.
+    """
+
+    from .models import Permission
+
+    content_type = ContentType.objects.get_for_model(Permission)
+    permissions = Permission.objects.filter(
+        codename__in=codenames, content_type=content_type
+    ).prefetch_related("user_set__person")
+
+    return {
+        permission.codename: [user.person for user in permission.user_set.all()]
+        for permission in permissions
+    }
+
+
+_ACTIVE_PERSON_CACHE_VERSION_KEY = "active_person:version"
+
+
+def _active_person_cache_key(pk):
+    version = cache.get_or_set(_ACTIVE_PERSON_CACHE_VERSION_KEY, 0, timeout=None)
+
+    return f"active_person:{version}:{pk}"
+
+
+def _load_active_person(pk):
+    person = Person.objects.select_related("user").get(pk=pk)
+
+    user = get_active_user(person)
+
+    # populates the permission cache of the authentication backends
+    user.get_all_permissions()
+
+    return person
+
+
+def get_active_person(pk):
+    """
+    Returns the person with primary key ``pk`` with their user preloaded.
+
+    If the ``ACTIVE_PERSON_CACHE`` setting is enabled, the person together
+    with the user and the user's resolved permissions is stored
+    in the configured Django cache until invalidated
+    by :func:`invalidate_active_person` or :func:`invalidate_active_persons`.
+    """
+
+    if not settings.ACTIVE_PERSON_CACHE:
+        return Person.objects.select_related("user").get(pk=pk)
+
+    key = _active_person_cache_key(pk)
+    person = cache.get(key)
+
+    if person is None:
+        person = _load_active_person(pk)
+        cache.set(key, person, settings.ACTIVE_PERSON_CACHE_TIMEOUT)
+
+    return person
+
+
+def invalidate_active_person(pk):
+    """
+    Removes the cached active person with primary key ``pk``.
+    """
+
+    if settings.ACTIVE_PERSON_CACHE:
+        cache.delete(_active_person_cache_key(pk))
+
+
+def invalidate_active_persons():
+    """
+    Removes all cached active persons.
+    """
+
+    if settings.ACTIVE_PERSON_CACHE:
+        try:
+            cache.incr(_ACTIVE_PERSON_CACHE_VERSION_KEY)
+        except ValueError:
+            cache.set(_ACTIVE_PERSON_CACHE_VERSION_KEY, 1, timeout=None)
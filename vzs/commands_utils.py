@@ -1,4 +1,10 @@
 from argparse import ArgumentTypeError
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from vzs.utils import send_digest_emails
 
 
 def lower_bounded_int(value, lower_bound_inclusive):
@@ -26,3 +32,56 @@ def positive_int(value):
 
 def non_negative_int(value):
     return lower_bounded_int(value, 0)
+
+
+class DigestCommand(BaseCommand):
+    """
+    Base of the commands notifying persons with a single digest email each.
+
+    Subclasses set :attr:`subject` and implement :meth:`collect_digests`.
+    """
+
+    subject = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the number of notifications and the time spent "
+            "collecting them, without sending anything.",
+        )
+
+    def collect_digests(self):
+        """
+        Returns a mapping of persons to lists of their notification messages.
+        """
+
+        raise NotImplementedError
+
+    def mark_processed(self):
+        """
+        Marks the notified items after the digests are sent.
+        """
+
+    def handle(self, *args, dry_run, **options):
+        start = perf_counter()
+        digests = self.collect_digests()
+        items_count = sum(len(items) for items in digests.values())
+
+        if dry_run:
+            self.stdout.write(
+                f"Would send {len(digests)} digests with {items_count} "
+                f"notifications, collected in {perf_counter() - start:.3f} s."
+            )
+            return
+
+        with atomic():
+            send_digest_emails(self.subject, digests)
+            self.mark_processed()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sent {len(digests)} digests with {items_count} "
+                f"notifications in {perf_counter() - start:.3f} s."
+            )
+        )
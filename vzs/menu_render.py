@@ -1,6 +1,66 @@
+from hashlib import md5
+
+from django.core.cache import cache
 from django.urls import resolve, reverse
 from django.utils.encoding import escape_uri_path
 
+from persons.models import get_active_user
+from vzs import settings
+
+
+class MenuPermissions:
+    """
+    Permissions of the active person to access the links of the menu.
+
+    The evaluated permissions are cached per user and the version
+    of the user's permission set. Any change of the user's permissions
+    changes the version, so the stale entry is never read again.
+    """
+
+    def __init__(self, active_person):
+        self.active_person = active_person
+        self.cache_key = self._get_cache_key(active_person)
+        self.mask = cache.get(self.cache_key, {})
+        self.changed = False
+
+    def __getitem__(self, reverse_link: str) -> bool:
+        if reverse_link not in self.mask:
+            self.mask[reverse_link] = self._evaluate(reverse_link)
+            self.changed = True
+
+        return self.mask[reverse_link]
+
+    def save(self):
+        """
+        Stores the newly evaluated permissions to the cache.
+        """
+
+        if self.changed:
+            cache.set(
+                self.cache_key, self.mask, settings.MENU_PERMISSIONS_CACHE_TIMEOUT
+            )
+            self.changed = False
+
+    def _evaluate(self, reverse_link: str):
+        match = resolve(reverse_link)
+
+        return match.func.view_class.view_has_permission_person(
+            "GET", self.active_person, GET={}, POST={}, **match.kwargs
+        )
+
+    @staticmethod
+    def _get_cache_key(active_person):
+        user = get_active_user(active_person)
+
+        permissions_set = [
+            str(user.is_active),
+            str(user.is_superuser),
+            *sorted(user.get_all_permissions()),
+        ]
+        version = md5("\n".join(permissions_set).encode()).hexdigest()
+
+        return f"menu_permissions:{user.pk}:{version}"
+
 
 class MenuItem:
     ITEM_WITHOUT_CHILDREN_HTML = """
@@ -48,11 +108,11 @@ class MenuItem:
         self.reverse_link = self._get_reversed_link(link)
         self.children = children
 
-    def render(self, context):
+    def render(self, context, permissions: MenuPermissions):
         if self.link is not None:
-            return self._render_item(context)
+            return self._render_item(context, permissions)
         else:
-            return self._render_item_with_children(context)
+            return self._render_item_with_children(context, permissions)
 
     def render_as_subitem(self, context):
         is_active = self._is_active(context, self.reverse_link, strict=True)
@@ -65,8 +125,8 @@ class MenuItem:
 
         return self.SUBITEM_HTML.format(**data)
 
-    def _render_item(self, context):
-        if not self._has_permission(context, self.reverse_link):
+    def _render_item(self, context, permissions):
+        if not permissions[self.reverse_link]:
             return ""
 
         is_active = self._is_active(context, self.reverse_link, strict=True)
@@ -80,12 +140,11 @@ class MenuItem:
 
         return self.ITEM_WITHOUT_CHILDREN_HTML.format(**date)
 
-    def _render_item_with_children(self, context):
-        permissions = {
-            child: self._has_permission(context, child.reverse_link)
-            for child in self.children
+    def _render_item_with_children(self, context, permissions):
+        children_permissions = {
+            child: permissions[child.reverse_link] for child in self.children
         }
-        if not any(permissions.values()):
+        if not any(children_permissions.values()):
             return ""
 
         children_reverse_links = [child.reverse_link for child in self.children]
@@ -98,7 +157,7 @@ class MenuItem:
         sub_items = [
             child.render_as_subitem(context)
             for child in self.children
-            if permissions[child]
+            if children_permissions[child]
         ]
 
         data = {
@@ -122,14 +181,6 @@ class MenuItem:
         else:
             return reverse(parts[0], args=[parts[1]])
 
-    @staticmethod
-    def _has_permission(context, reverse_link: str):
-        match = resolve(reverse_link)
-
-        return match.func.view_class.view_has_permission_person(
-            "GET", context["active_person"], GET={}, POST={}, **match.kwargs
-        )
-
     @staticmethod
     def _is_active(context, reverse_links: str | list, strict=False):
         request = context.get("request")
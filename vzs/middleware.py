@@ -0,0 +1,27 @@
+from django.db import connection
+
+
+class QueryCountMiddleware:
+    """
+    Counts the database queries executed while handling a request.
+
+    The count is exposed in the ``X-Query-Count`` response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+
+        response["X-Query-Count"] = query_count
+
+        return response
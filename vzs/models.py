@@ -1,6 +1,7 @@
 from django.db.models import Model
 from django.template import RequestContext
 from django.template.loader import render_to_string
+from polymorphic.models import PolymorphicModel
 
 
 class RenderableModelMixin:
@@ -40,6 +41,11 @@ class ExportableCSVMixin:
     csv_order = []
     csv_labels = {}
     csv_getters = {}
+    csv_select_related = []
+    """
+    Additional related fields to select when exporting,
+    e.g. the relations followed by ``csv_getters``.
+    """
     __labels = None
     __getters = None
 
@@ -72,3 +78,33 @@ class ExportableCSVMixin:
 
     def csv_row(self):
         return [getter(self) for getter in self.__getters]
+
+    @classmethod
+    def csv_queryset(cls, queryset):
+        """
+        Returns the ``queryset`` with the relations exported by ``csv_order``
+        and ``csv_select_related`` loaded in advance.
+
+        Forward foreign keys and one-to-one relations are selected,
+        many-to-many and reverse foreign key relations are prefetched.
+        Relations to polymorphic models are prefetched as well,
+        so that the instances of the correct subclasses are exported.
+        """
+
+        select_related = list(cls.csv_select_related)
+        prefetch_related = []
+
+        for field in cls._meta.get_fields():
+            if field.name not in cls.csv_order or not field.is_relation:
+                continue
+
+            is_polymorphic = issubclass(field.related_model, PolymorphicModel)
+
+            if (field.many_to_one or field.one_to_one) and not is_polymorphic:
+                select_related.append(field.name)
+            else:
+                prefetch_related.append(field.name)
+
+        return queryset.select_related(*select_related).prefetch_related(
+            *prefetch_related
+        )
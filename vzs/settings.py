@@ -68,6 +68,7 @@ INSTALLED_APPS = [
     "features.apps.FeaturesConfig",
     "groups.apps.GroupsConfig",
     "api.apps.APIConfig",
+    "emails.apps.EmailsConfig",
     # Template tags
     "vzs",
 ]
@@ -262,6 +263,9 @@ EMAIL_USE_SSL = env.bool("EMAIL_USE_SSL", default=False)
 
 EMAIL_SENDER = env.str("EMAIL_SENDER", default="noreply@vzs-praha15.cz")
 
+# Emails are stored in the outbox and sent by the send_queued_emails command
+EMAIL_QUEUE = env.bool("EMAIL_QUEUE", default=True)
+
 if EMAIL_HOST == "localhost":
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
@@ -272,6 +276,10 @@ GOOGLE_SECRETS_FILE = BASE_DIR / "google_integration/secrets_file.json"
 GOOGLE_DOMAIN = env.str("GOOGLE_DOMAIN", default="vzs-praha15.cz")
 GOOGLE_MAPS_API_KEY = env.str("GOOGLE_MAPS_API_KEY", default=None)
 
+# Directory API calls per second, shared by all the synchronization threads
+GOOGLE_DIRECTORY_RATE_LIMIT = env.float("GOOGLE_DIRECTORY_RATE_LIMIT", default=20)
+GOOGLE_SYNC_WORKERS = env.int("GOOGLE_SYNC_WORKERS", default=4)
+
 # Settings for export to Pohoda
 
 ICO = env.str("ICO", default="65996739")
@@ -314,6 +322,19 @@ if env.bool("REDIS_ENABLE", default=False):
         },
     }
 
+# Caching of the active person with their user and permissions across requests,
+# requires a cache shared by all workers (Redis)
+ACTIVE_PERSON_CACHE = env.bool("ACTIVE_PERSON_CACHE", default=False)
+ACTIVE_PERSON_CACHE_TIMEOUT = env.int("ACTIVE_PERSON_CACHE_TIMEOUT", default=300)
+
+# Caching of the evaluated permissions to the links of the sidebar menu,
+# keyed by the user and the version of their permission set
+MENU_PERMISSIONS_CACHE_TIMEOUT = env.int("MENU_PERMISSIONS_CACHE_TIMEOUT", default=3600)
+
+# Exposes the number of DB queries of each request in the X-Query-Count header
+if env.bool("QUERY_COUNT_HEADER", default=False):
+    MIDDLEWARE.insert(0, "vzs.middleware.QueryCountMiddleware")
+
 # Constants
 ADMIN_EMAIL = "system@vzs-praha15.cz"
 VALUE_MISSING_HTML = '<i class="fas fa-times"></i>'
@@ -337,10 +358,19 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Seconds the next_since of the API change feed is moved back by,
+# so that the rows saved by transactions committed later are not missed
+API_SYNC_MARGIN = env.int("API_SYNC_MARGIN", default=300)
+
 # CRONTAB
 CRONJOBS = [
     ("0 3 * * *", "features.cron.features_expiry_send_mails"),
     ("0 4 * * *", "one_time_events.cron.unclosed_one_time_events_send_mails"),
     ("0 5 * * *", "trainings.cron.unclosed_trainings_send_mails"),
+    ("15 2 * * *", "trainings.cron.enrollment_counts_repair"),
     ("0 1 * * 0", "users.cron.garbage_collect_tokens"),
+    ("0 2 * * *", "events.cron.participant_eligibility_rebuild"),
+    ("* * * * *", "emails.cron.queued_emails_send"),
+    ("*/5 * * * *", "groups.cron.groups_sync"),
+    ("30 2 * * *", "groups.cron.groups_full_sync"),
 ]
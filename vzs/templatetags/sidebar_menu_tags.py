@@ -1,15 +1,16 @@
 from django import template
+from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-from one_time_events.views import OneTimeEventAdminListView
-from trainings.views import TrainingAdminListView
-from vzs.menu_render import MenuItem
+from vzs.menu_render import MenuItem, MenuPermissions
 
 register = template.Library()
 
 
 @register.simple_tag(takes_context=True)
 def render_menu(context):
+    permissions = MenuPermissions(context["active_person"])
+
     menu_structure = [
         MenuItem("Dashboard", "pages:home", icon="fas fa-home"),
         MenuItem(
@@ -31,8 +32,8 @@ def render_menu(context):
                 MenuItem("Vybavení", "equipments:index"),
             ],
         ),
-        get_one_time_events_menu_item(context),
-        get_trainings_menu_item(context),
+        get_one_time_events_menu_item(permissions),
+        get_trainings_menu_item(permissions),
         MenuItem(
             "Správa událostí",
             icon="fab fa-elementor",
@@ -63,17 +64,15 @@ def render_menu(context):
     output = []
 
     for item in menu_structure:
-        output.append(item.render(context))
+        output.append(item.render(context, permissions))
+
+    permissions.save()
 
     return mark_safe("".join(output))
 
 
-def get_one_time_events_menu_item(context):
-    can_person_edit_one_time_events = (
-        OneTimeEventAdminListView.view_has_permission_person(
-            "GET", context["active_person"], POST={}
-        )
-    )
+def get_one_time_events_menu_item(permissions):
+    can_person_edit_one_time_events = permissions[reverse("one_time_events:list-admin")]
 
     if can_person_edit_one_time_events:
         return MenuItem(
@@ -89,10 +88,8 @@ def get_one_time_events_menu_item(context):
         return MenuItem("Akce", "one_time_events:index", icon="fas fa-calendar")
 
 
-def get_trainings_menu_item(context):
-    can_person_edit_trainings = TrainingAdminListView.view_has_permission_person(
-        "GET", context["active_person"], POST={}
-    )
+def get_trainings_menu_item(permissions):
+    can_person_edit_trainings = permissions[reverse("trainings:list-admin")]
 
     if can_person_edit_trainings:
         return MenuItem(
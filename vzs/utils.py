@@ -7,50 +7,100 @@ from urllib.parse import quote
 
 import unicodedata
 from django.core.mail import send_mail as django_send_mail
-from django.db.models import Model
+from django.db.models import Model, prefetch_related_objects
 from django.db.models.query import Q, QuerySet
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.template.loader import render_to_string
 from django.templatetags.static import static
 from django.urls import reverse
 from django.utils import formats
+from django.utils.html import escape
 from django.utils.timezone import localdate, make_aware, localtime
 
 from vzs import settings
 from vzs.settings import CURRENT_DATETIME, SERVER_DOMAIN, SERVER_PROTOCOL, EMAIL_SENDER
 
 
-def get_csv_writer_http_response(filename):
-    response = HttpResponse(
+class _EchoBuffer:
+    """
+    A file-like object that returns the written value instead of storing it.
+
+    Lets ``csv.writer`` produce the rows for a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_csv_streaming_http_response(filename, rows):
+    """
+    Returns a streaming HTTP response with the ``rows`` written as a CSV file.
+
+    The ``rows`` are consumed lazily while the response is being sent.
+    """
+
+    writer = csv.writer(_EchoBuffer(), delimiter=";")
+
+    def content():
+        yield "\ufeff"
+
+        for row in rows:
+            yield writer.writerow(row)
+
+    return StreamingHttpResponse(
+        content(),
         content_type="text/csv",
         headers={"Content-Disposition": rfc5987_content_disposition(f"{filename}.csv")},
     )
-    response.write("\ufeff".encode("utf8"))
 
-    writer = csv.writer(response, delimiter=";")
 
-    return writer, response
+def get_xml_streaming_http_response(filename, content):
+    """
+    Returns a streaming HTTP response with an XML file
+    consisting of the ``content`` chunks.
+    """
 
+    def chunks():
+        yield "\ufeff"
+        yield from content
 
-def get_xml_http_response(filename):
-    response = HttpResponse(
+    return StreamingHttpResponse(
+        chunks(),
         content_type="text/xml",
         headers={"Content-Disposition": rfc5987_content_disposition(f"{filename}.xml")},
     )
-    response.write("\ufeff".encode("utf8"))
 
-    return response
 
+def export_queryset_csv(filename, queryset, chunk_size=2000):
+    """
+    Exports the ``queryset`` of a model with
+    :class:`vzs.models.ExportableCSVMixin` as a streaming CSV response.
+
+    The instances are loaded in chunks of ``chunk_size``
+    together with their exported relations.
+    """
+
+    model = queryset.model
+
+    def rows():
+        yield model.csv_header()
 
-def export_queryset_csv(filename, queryset):
-    writer, http_response = get_csv_writer_http_response(filename)
+        for instance in model.csv_queryset(queryset).iterator(chunk_size=chunk_size):
+            yield instance.csv_row()
 
-    writer.writerow(queryset.model.csv_header())
+    return get_csv_streaming_http_response(filename, rows())
 
-    for instance in queryset:
-        writer.writerow(instance.csv_row())
 
-    return http_response
+def normalize_search_text(text):
+    """
+    Returns ``text`` in lower case, without diacritics and with single spaces,
+    so that e.g. ``"Šťastný  Jiří"`` is searchable as ``"stastny jiri"``.
+    """
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+
+    return " ".join(folded.casefold().split())
 
 
 def rfc5987_content_disposition(file_name):
@@ -73,7 +123,11 @@ def reverse_with_get_params(*args, **kwargs):
     return url
 
 
-def send_mail(subject, message, recipient_list, *args, **kwargs):
+def render_email(subject, message, **kwargs):
+    """
+    Renders the email into the ``email.html`` layout.
+    """
+
     data = {
         "title": kwargs.get("title", subject),
         "body": kwargs.get("html_message", f"<p>{message}</p>"),
@@ -82,7 +136,24 @@ def send_mail(subject, message, recipient_list, *args, **kwargs):
         "logo_url": get_server_url() + static("logo.png"),
     }
 
-    html_message = render_to_string("email.html", data)
+    return render_to_string("email.html", data)
+
+
+def send_mail(subject, message, recipient_list, *args, **kwargs):
+    """
+    Renders the email into the ``email.html`` layout and sends it.
+
+    If the ``EMAIL_QUEUE`` setting is enabled, the email is only added
+    to the outbox and sent later by the ``send_queued_emails`` command.
+    """
+
+    html_message = render_email(subject, message, **kwargs)
+
+    if settings.EMAIL_QUEUE:
+        from emails.models import QueuedEmail
+
+        QueuedEmail.enqueue(subject, html_message, EMAIL_SENDER, recipient_list)
+        return
 
     django_send_mail(
         subject=subject,
@@ -94,20 +165,80 @@ def send_mail(subject, message, recipient_list, *args, **kwargs):
 
 
 def send_notification_email(subject, message, persons_list, *args, **kwargs):
-    recipient_set = set()
-    for person in persons_list:
-        for recipient in email_notification_recipient_set(person):
-            recipient_set.add(recipient)
-
     send_mail(
         subject,
         message,
-        list(recipient_set),
+        notification_recipient_list(persons_list),
         *args,
         **kwargs,
     )
 
 
+def send_notification_emails(emails, batch=""):
+    """
+    Renders a batch of notification emails and sends them.
+
+    ``emails`` is an iterable of ``(subject, message, persons_list)`` triples.
+    The ``managed_by`` relation of the persons should be prefetched.
+
+    If the ``EMAIL_QUEUE`` setting is enabled, all the emails are added
+    to the outbox at once, tagged with ``batch``.
+    """
+
+    rendered_emails = [
+        (
+            subject,
+            render_email(subject, message),
+            notification_recipient_list(persons_list),
+        )
+        for subject, message, persons_list in emails
+    ]
+
+    if settings.EMAIL_QUEUE:
+        from emails.models import QueuedEmail
+
+        QueuedEmail.enqueue_many(rendered_emails, EMAIL_SENDER, batch)
+        return
+
+    for subject, html_message, recipient_list in rendered_emails:
+        django_send_mail(
+            subject=subject,
+            message="",
+            html_message=html_message,
+            from_email=EMAIL_SENDER,
+            recipient_list=recipient_list,
+        )
+
+
+def send_digest_emails(subject, items_by_person, batch=""):
+    """
+    Sends each person a single email listing all of their notifications.
+
+    ``items_by_person`` is a mapping of persons to lists of messages.
+    The ``managed_by`` relation of the persons is prefetched here
+    and the emails are sent by :func:`send_notification_emails`.
+    """
+
+    prefetch_related_objects(list(items_by_person), "managed_by")
+
+    send_notification_emails(
+        (
+            (subject, "<br>".join(escape(str(item)) for item in items), [person])
+            for person, items in items_by_person.items()
+        ),
+        batch,
+    )
+
+
+def notification_recipient_list(persons_list):
+    recipient_set = set()
+    for person in persons_list:
+        for recipient in email_notification_recipient_set(person):
+            recipient_set.add(recipient)
+
+    return list(recipient_set)
+
+
 def email_notification_recipient_set(person):
     emails = set()
 